@@ -10,6 +10,11 @@ DB_PATH = os.getenv("DB_PATH", "nutrition.db")
 # Connect to SQLite
 conn = sqlite3.connect(DB_PATH)
 
+# WAL mode turns writes into append-only commits so readers never block
+# writers; NORMAL sync is safe with WAL and skips an fsync per commit
+conn.execute("PRAGMA journal_mode=WAL")
+conn.execute("PRAGMA synchronous=NORMAL")
+
 # Create tables
 conn.execute("""
 CREATE TABLE IF NOT EXISTS users (
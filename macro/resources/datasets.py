@@ -1,5 +1,4 @@
 import os
-import glob
 import json
 import pandas as pd
 from datetime import datetime
@@ -8,6 +7,73 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Cache de info por dataset keyed por path, invalidado por mtime: los CSV no
+# cambian una vez escritos, así cada listado no re-parsea headers ni metadata
+_dataset_info_cache = {}
+
+
+def _find_dataset_csvs(base_dir: str) -> list:
+    """
+    Encuentra los CSV de datasets ordenados por mtime descendente.
+
+    Usa os.scandir en vez de glob: el patrón es trivial (prefijo + extensión)
+    y DirEntry.stat() viene cacheado del propio readdir, así no se paga un
+    stat extra por archivo para ordenar por fecha.
+
+    Returns:
+        list: Pares (csv_path, mtime), el más reciente primero
+    """
+    results = []
+    try:
+        with os.scandir(base_dir) as base_entries:
+            dataset_dirs = [
+                entry.path for entry in base_entries
+                if entry.name.startswith("FRED_dataset_") and entry.is_dir()
+            ]
+    except OSError:
+        return results
+
+    for dataset_dir in dataset_dirs:
+        try:
+            with os.scandir(dataset_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".csv") and entry.is_file():
+                        results.append((entry.path, entry.stat().st_mtime))
+        except OSError:
+            continue
+
+    results.sort(key=lambda pair: pair[1], reverse=True)
+    return results
+
+
+def _find_metadata_file(dataset_dir: str):
+    """Devuelve el path del primer JSON de metadata del dataset, o None."""
+    try:
+        with os.scandir(dataset_dir) as entries:
+            for entry in entries:
+                if '_metadata_' in entry.name and entry.name.endswith('.json'):
+                    return entry.path
+    except OSError:
+        pass
+    return None
+
+
+def _read_dataset_columns(csv_path: str, mtime: float) -> list:
+    """Lee los headers del CSV (sin la columna date), cacheado por mtime."""
+    cached = _dataset_info_cache.get(('columns', csv_path))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        df = pd.read_csv(csv_path, nrows=0)  # Solo leer headers
+        columns = [col for col in df.columns if col != 'date']
+    except Exception as e:
+        logger.warning(f"No se pudo leer {os.path.basename(csv_path)}: {e}")
+        columns = []
+
+    _dataset_info_cache[('columns', csv_path)] = (mtime, columns)
+    return columns
+
 
 def list_recent_datasets(limit: int = 5, base_dir: str = r"C:\Users\agust\Downloads\FRED_Data") -> str:
     """
@@ -41,8 +107,8 @@ def list_recent_datasets(limit: int = 5, base_dir: str = r"C:\Users\agust\Downlo
 
     try:
         # === 1. BUSCAR TODOS LOS DATASETS ===
-        pattern = os.path.join(base_dir, "FRED_dataset_*", "*.csv")
-        csv_files = glob.glob(pattern)
+        # Ya vienen ordenados por fecha de modificación (más reciente primero)
+        csv_files = _find_dataset_csvs(base_dir)
 
         if not csv_files:
             return f"""📂 No se encontraron datasets en {base_dir}
@@ -50,9 +116,6 @@ def list_recent_datasets(limit: int = 5, base_dir: str = r"C:\Users\agust\Downlo
 💡 Para crear un dataset usa:
    build_fred_dataset_tool(series_list=['UNRATE', 'CPIAUCSL'], ...)"""
 
-        # Ordenar por fecha de modificación (más reciente primero)
-        csv_files.sort(key=os.path.getmtime, reverse=True)
-
         # Limitar resultados
         csv_files = csv_files[:limit]
 
@@ -61,7 +124,14 @@ def list_recent_datasets(limit: int = 5, base_dir: str = r"C:\Users\agust\Downlo
         # === 2. RECOLECTAR INFORMACIÓN DE CADA DATASET ===
         datasets_info = []
 
-        for csv_path in csv_files:
+        for csv_path, creation_time in csv_files:
+            # Si el archivo no cambió desde el último listado, reusar la info
+            # completa sin tocar el CSV ni la metadata
+            cached = _dataset_info_cache.get(('info', csv_path))
+            if cached and cached[0] == creation_time:
+                datasets_info.append(cached[1])
+                continue
+
             dataset_dir = os.path.dirname(csv_path)
             csv_name = os.path.basename(csv_path)
 
@@ -85,25 +155,18 @@ def list_recent_datasets(limit: int = 5, base_dir: str = r"C:\Users\agust\Downlo
                 dataset_name = csv_name.replace('.csv', '')
 
             # Fecha de creación
-            creation_time = os.path.getmtime(csv_path)
             creation_date = datetime.fromtimestamp(creation_time).strftime('%Y-%m-%d %H:%M:%S')
 
-            # Leer columnas del CSV
-            try:
-                df = pd.read_csv(csv_path, nrows=0)  # Solo leer headers
-                columns = [col for col in df.columns if col != 'date']
-            except Exception as e:
-                logger.warning(f"No se pudo leer {csv_name}: {e}")
-                columns = []
+            # Leer columnas del CSV (cacheado por mtime)
+            columns = _read_dataset_columns(csv_path, creation_time)
 
             # Leer metadata si existe
-            metadata_pattern = os.path.join(dataset_dir, "*_metadata_*.json")
-            metadata_files = glob.glob(metadata_pattern)
+            metadata_file = _find_metadata_file(dataset_dir)
 
             metadata = {}
-            if metadata_files:
+            if metadata_file:
                 try:
-                    with open(metadata_files[0], 'r', encoding='utf-8') as f:
+                    with open(metadata_file, 'r', encoding='utf-8') as f:
                         metadata = json.load(f)
                 except Exception as e:
                     logger.warning(f"No se pudo leer metadata: {e}")
@@ -122,7 +185,7 @@ def list_recent_datasets(limit: int = 5, base_dir: str = r"C:\Users\agust\Downlo
                 if trans_type and trans_type != 'none':
                     transform_info.append(f"{series_id} → {trans_type}")
 
-            datasets_info.append({
+            info = {
                 'name': dataset_name,
                 'creation_date': creation_date,
                 'start_date': start_date,
@@ -132,7 +195,9 @@ def list_recent_datasets(limit: int = 5, base_dir: str = r"C:\Users\agust\Downlo
                 'transformations': transform_info,
                 'csv_path': csv_path,
                 'dataset_dir': dataset_dir
-            })
+            }
+            _dataset_info_cache[('info', csv_path)] = (creation_time, info)
+            datasets_info.append(info)
 
         # === 3. FORMATEAR SALIDA ===
         output_lines = [
@@ -194,32 +259,28 @@ def find_dataset_with_columns(columns: list, base_dir: str = r"C:\Users\agust\Do
     """
 
     try:
-        pattern = os.path.join(base_dir, "FRED_dataset_*", "*.csv")
-        csv_files = glob.glob(pattern)
+        # Ya vienen ordenados por fecha (más reciente primero)
+        csv_files = _find_dataset_csvs(base_dir)
 
         if not csv_files:
             return None
 
-        # Ordenar por fecha (más reciente primero)
-        csv_files.sort(key=os.path.getmtime, reverse=True)
-
         # Buscar primer dataset que contenga todas las columnas
-        for csv_path in csv_files:
-            try:
-                df = pd.read_csv(csv_path, nrows=0)
-                dataset_columns = set(df.columns)
-
-                # Verificar si todas las columnas requeridas están presentes
-                if all(col in dataset_columns for col in columns):
-                    logger.info(f"✅ Dataset encontrado con columnas {columns}: {csv_path}")
-                    return {
-                        'csv_path': csv_path,
-                        'columns': list(dataset_columns),
-                        'creation_date': datetime.fromtimestamp(os.path.getmtime(csv_path)).strftime('%Y-%m-%d %H:%M:%S')
-                    }
-            except Exception as e:
-                logger.warning(f"Error leyendo {csv_path}: {e}")
+        for csv_path, mtime in csv_files:
+            data_columns = _read_dataset_columns(csv_path, mtime)
+            if not data_columns:
                 continue
+            dataset_columns = set(data_columns)
+            dataset_columns.add('date')
+
+            # Verificar si todas las columnas requeridas están presentes
+            if all(col in dataset_columns for col in columns):
+                logger.info(f"✅ Dataset encontrado con columnas {columns}: {csv_path}")
+                return {
+                    'csv_path': csv_path,
+                    'columns': list(dataset_columns),
+                    'creation_date': datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+                }
 
         logger.info(f"❌ No se encontró dataset con columnas {columns}")
         return None
@@ -0,0 +1,170 @@
+"""
+Standalone Tkinter image viewer launched by gui_backend.
+
+Usage:
+    python _tk_viewer.py <image_path> [title]   # one-shot window
+    python _tk_viewer.py --daemon               # long-lived viewer
+
+In daemon mode the process pre-imports tkinter once and then reads
+requests from stdin, one per line, formatted as "image_path\ttitle".
+Each request updates the (single) viewer window, so opening another plot
+costs the parent a pipe write instead of a full interpreter launch.
+
+Kept as a static file so opening a plot never writes a generated script
+to a temp file.
+"""
+import sys
+import os
+
+# CRITICAL: Redirect ALL output immediately
+sys.stdout = open(os.devnull, 'w')
+sys.stderr = open(os.devnull, 'w')
+
+# Now import GUI libraries (no output possible)
+try:
+    import tkinter as tk
+except ImportError:
+    sys.exit(1)
+
+MAX_WIDTH, MAX_HEIGHT = 1200, 800
+
+
+def _load_photo(image_path):
+    """Load and downscale the image, returning a PhotoImage."""
+    # Tk 8.6+ decodifica PNG nativamente: para los plots generados aca
+    # alcanza con PhotoImage + subsample y nos ahorramos importar Pillow
+    # (extensiones C + registro de plugins) en cada arranque del viewer
+    try:
+        photo = tk.PhotoImage(file=image_path)
+    except tk.TclError:
+        return _load_photo_pil(image_path)
+
+    # subsample solo acepta factores enteros: ceil para no pasarse del limite
+    factor = max(
+        -(-photo.width() // MAX_WIDTH),
+        -(-photo.height() // MAX_HEIGHT),
+    )
+    if factor > 1:
+        photo = photo.subsample(factor)
+    return photo
+
+
+def _load_photo_pil(image_path):
+    """Fallback con Pillow para formatos que Tk no sabe decodificar."""
+    from PIL import Image, ImageTk
+
+    img = Image.open(image_path)
+
+    if img.width > MAX_WIDTH or img.height > MAX_HEIGHT:
+        ratio = min(MAX_WIDTH / img.width, MAX_HEIGHT / img.height)
+        new_size = (int(img.width * ratio), int(img.height * ratio))
+        img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+    return ImageTk.PhotoImage(img)
+
+
+def _center(root):
+    root.update_idletasks()
+    width = root.winfo_width()
+    height = root.winfo_height()
+    x = (root.winfo_screenwidth() // 2) - (width // 2)
+    y = (root.winfo_screenheight() // 2) - (height // 2)
+    root.geometry(f'{width}x{height}+{x}+{y}')
+
+
+def _one_shot(image_path, title):
+    root = tk.Tk()
+    root.title(title)
+
+    photo = _load_photo(image_path)
+
+    label = tk.Label(root, image=photo)
+    label.image = photo
+    label.pack()
+
+    btn_frame = tk.Frame(root)
+    btn_frame.pack(pady=5)
+
+    close_btn = tk.Button(btn_frame, text="Close (ESC)", command=root.destroy, padx=20, pady=5)
+    close_btn.pack()
+
+    root.bind('<Escape>', lambda e: root.destroy())
+
+    _center(root)
+
+    root.mainloop()
+
+
+def _daemon():
+    import queue
+    import threading
+
+    requests = queue.Queue()
+
+    def _reader():
+        # stdin EOF means the parent closed the pipe (or died): time to exit
+        for line in sys.stdin:
+            line = line.rstrip('\n')
+            if line:
+                requests.put(line)
+        requests.put(None)
+
+    root = tk.Tk()
+    root.withdraw()
+
+    label = tk.Label(root)
+    label.pack()
+
+    btn_frame = tk.Frame(root)
+    btn_frame.pack(pady=5)
+
+    # Hiding instead of destroying keeps the daemon (and its warm imports)
+    # alive for the next plot
+    close_btn = tk.Button(btn_frame, text="Close (ESC)", command=root.withdraw, padx=20, pady=5)
+    close_btn.pack()
+
+    root.bind('<Escape>', lambda e: root.withdraw())
+    root.protocol('WM_DELETE_WINDOW', root.withdraw)
+
+    def _show(request):
+        image_path, _, title = request.partition('\t')
+        try:
+            photo = _load_photo(image_path)
+        except Exception:
+            return
+        label.configure(image=photo)
+        label.image = photo
+        root.title(title or f"Plot Preview - {os.path.basename(image_path)}")
+        root.deiconify()
+        _center(root)
+        root.lift()
+
+    def _poll():
+        # Tk no es thread-safe: el thread lector solo encola y el loop de
+        # eventos consume desde aca
+        try:
+            while True:
+                request = requests.get_nowait()
+                if request is None:
+                    root.destroy()
+                    return
+                _show(request)
+        except queue.Empty:
+            pass
+        root.after(100, _poll)
+
+    threading.Thread(target=_reader, daemon=True).start()
+    root.after(100, _poll)
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == '--daemon':
+            _daemon()
+        else:
+            image_path = sys.argv[1]
+            title = sys.argv[2] if len(sys.argv) > 2 else f"Plot Preview - {os.path.basename(image_path)}"
+            _one_shot(image_path, title)
+    except Exception:
+        sys.exit(1)
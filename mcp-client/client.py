@@ -1,4 +1,5 @@
 import asyncio
+import json
 import os
 import sys
 from typing import Optional
@@ -7,13 +8,13 @@ from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 
 # Importar la nueva UI
 from ui import ConsoleUI
 # Importar sistema de comandos
-from commands import CommandHandler
+from commands import CommandHandler, CmdResult
 # Importar utilidades de Fase 3
 from utils import ConversationHistory, ResourceCache
 from utils.input_handler import InputHandler
@@ -26,7 +27,10 @@ class MCPClient:
         # Initialize session and client objects
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
-        self.anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.anthropic = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        # Método ligado una sola vez: evita resolver .messages.create (dos
+        # lookups de atributo) en cada llamada a la API
+        self._messages_create = self.anthropic.messages.create
 
         # Initialize UI
         self.ui = ConsoleUI()
@@ -43,6 +47,18 @@ class MCPClient:
         # Initialize input handler with autocompletion (Fase 3)
         self.input_handler = InputHandler(history_file=".mcp_history")
 
+        # Dispatch de visualizaciones mejoradas por herramienta de fetch:
+        # un solo dict lookup al metodo de UI correspondiente
+        self._fetch_visualizers = {
+            "fetch_series_metadata_tool": self.ui.show_series_metadata,
+            "fetch_series_observations_tool": self.ui.show_series_observations,
+            "search_fred_series_tool": self.ui.show_search_results,
+            "fetch_fred_releases_tool": self.ui.show_fred_releases,
+            "fetch_release_details_tool": self.ui.show_release_details,
+            "fetch_category_details_tool": self.ui.show_category_details,
+            "fetch_fred_sources_tool": self.ui.show_fred_sources,
+        }
+
 
     async def connect(self, server_script_path: str = "server_mcp.py:server"):
         """Conectar a el MCP server python."""
@@ -113,15 +129,17 @@ class MCPClient:
             "content": query
         })
 
-        # Usar el historial completo para mantener contexto
-        messages = self.conversation_history.copy()
+        # Usar el historial completo para mantener contexto. No hace falta
+        # copiar la lista: el SDK la serializa dentro de create(), cuyo await
+        # termina antes de que volvamos a mutar el historial.
+        messages = self.conversation_history
 
         # Paso 2: Obtener herramientas disponibles del servidor MCP (con caché)
-        cached_tools = self.cache.get("tools_list")
-        if cached_tools:
-            # IMPORTANTE: Hacer copia para no modificar el caché
-            available_tools = cached_tools.copy()
-        else:
+        # La lista cacheada ya incluye la herramienta sintética de recursos,
+        # así el camino caliente no hace ningún await ni copia la lista:
+        # nadie la muta después, el SDK solo la lee al serializar la request
+        available_tools = self.cache.get("tools_list")
+        if available_tools is None:
             response = await self.session.list_tools()
             available_tools = [
                 {
@@ -131,16 +149,13 @@ class MCPClient:
                 }
                 for tool in response.tools
             ]
-            self.cache.set("tools_list", available_tools)
 
-        # Paso 2b: Agregar herramienta sintética para leer recursos MCP
-        try:
-            resources_response = await self.session.list_resources()
-            if resources_response.resources:
-                resource_uris = [str(r.uri) for r in resources_response.resources]
+            # Paso 2b: Agregar herramienta sintética para leer recursos MCP
+            try:
+                resources_response = await self.session.list_resources()
+                if resources_response.resources:
+                    resource_uris = [str(r.uri) for r in resources_response.resources]
 
-                # Verificar que no esté ya en la lista (por si acaso)
-                if not any(t.get("name") == "read_mcp_resource" for t in available_tools):
                     available_tools.append({
                         "name": "read_mcp_resource",
                         "description": f"Lee un recurso MCP del servidor. Recursos disponibles: {', '.join(resource_uris)}",
@@ -155,8 +170,10 @@ class MCPClient:
                             "required": ["uri"]
                         }
                     })
-        except Exception as e:
-            self.ui.show_warning(f"No se pudieron obtener recursos: {e}")
+            except Exception as e:
+                self.ui.show_warning(f"No se pudieron obtener recursos: {e}")
+
+            self.cache.set("tools_list", available_tools)
 
         # Paso 3: Primer razonamiento de Claude con las herramientas disponibles
         # Crear progreso en vivo
@@ -166,7 +183,7 @@ class MCPClient:
             # Iniciar tarea de progreso
             task = progress.add_task("[cyan]Enviando consulta a Claude AI...", total=None)
 
-            claude_response = self.anthropic.messages.create(
+            claude_response = await self._messages_create(
                 model="claude-3-5-haiku-20241022",
                 max_tokens=4096,
                 messages=messages,
@@ -177,18 +194,28 @@ class MCPClient:
             self.ui.update_progress_status(progress, task, "Claude ha procesado la consulta", "green")
 
         # Paso 4: Guardar la respuesta de Claude en el historial
-        # Convertir content blocks a formato de diccionario
-        assistant_content = []
-        for content in claude_response.content:
-            if content.type == "text":
-                assistant_content.append({"type": "text", "text": content.text})
-            elif content.type == "tool_use":
-                assistant_content.append({
-                    "type": "tool_use",
-                    "id": content.id,
-                    "name": content.name,
-                    "input": content.input
-                })
+        # Fast path: un solo bloque de texto (el caso tipico sin tools) se
+        # guarda como string directo, formato que la API acepta igual, sin
+        # construir la lista de dicts intermedia
+        response_blocks = claude_response.content
+        if len(response_blocks) == 1 and response_blocks[0].type == "text":
+            assistant_content = response_blocks[0].text
+            has_tool_use = False
+        else:
+            # Convertir content blocks a formato de diccionario
+            assistant_content = []
+            has_tool_use = False
+            for content in response_blocks:
+                if content.type == "text":
+                    assistant_content.append({"type": "text", "text": content.text})
+                elif content.type == "tool_use":
+                    has_tool_use = True
+                    assistant_content.append({
+                        "type": "tool_use",
+                        "id": content.id,
+                        "name": content.name,
+                        "input": content.input
+                    })
 
         self.conversation_history.append({
             "role": "assistant",
@@ -201,13 +228,13 @@ class MCPClient:
         tools_used = []  # Rastrear herramientas usadas
 
         # Crear progreso para ejecución de herramientas si es necesario
-        has_tool_use = any(content.type == "tool_use" for content in claude_response.content)
-
+        # (el flag ya quedó calculado al recorrer los content blocks arriba)
         if has_tool_use:
             progress = self.ui.create_live_progress()
             with progress:
                 task = progress.add_task("[cyan]Preparando ejecucion de herramientas...", total=None)
 
+                tool_blocks = []
                 for content in claude_response.content:
                     # Si Claude responde directamente con texto
                     if content.type == "text":
@@ -215,55 +242,63 @@ class MCPClient:
 
                     # Si Claude decide usar una herramienta del MCP
                     elif content.type == "tool_use":
-                        tool_name = content.name
-                        tool_args = content.input or {}
-                        tool_use_id = content.id
-
-                        # Rastrear herramienta usada
-                        tools_used.append(tool_name)
-
-                        # Actualizar progreso con nombre de herramienta
-                        args_preview = ", ".join([f"{k}={str(v)[:20]}..." if len(str(v)) > 20 else f"{k}={v}" for k, v in list(tool_args.items())[:2]])
-                        self.ui.update_progress_status(progress, task, f"Ejecutando: {tool_name}({args_preview})", "yellow")
-
-                        try:
-                            # Manejar lectura de recursos MCP
-                            if tool_name == "read_mcp_resource":
-                                resource_uri = tool_args.get("uri")
-                                resource_result = await self.session.read_resource(resource_uri)
-                                result_text = (
-                                    resource_result.contents[0].text
-                                    if resource_result.contents and hasattr(resource_result.contents[0], "text")
-                                    else str(resource_result.contents)
-                                )
-                            else:
-                                # Ejecutar la herramienta MCP normal
-                                tool_result = await self.session.call_tool(tool_name, tool_args)
-                                result_text = (
-                                    tool_result.content[0].text
-                                    if tool_result.content and hasattr(tool_result.content[0], "text")
-                                    else str(tool_result.content)
-                                )
-
-                            # Detectar y mostrar visualización mejorada para fetch tools
-                            self._show_enhanced_fetch_result(tool_name, result_text)
-
-                            # Agregar resultado a la lista de tool_results
-                            tool_results.append({
-                                "type": "tool_result",
-                                "tool_use_id": tool_use_id,
-                                "content": result_text
-                            })
-
-                        except Exception as e:
-                            error_msg = f"Error: {str(e)}"
-                            self.ui.show_error(e, f"Al ejecutar herramienta '{tool_name}'")
-                            tool_results.append({
-                                "type": "tool_result",
-                                "tool_use_id": tool_use_id,
-                                "content": error_msg,
-                                "is_error": True
-                            })
+                        tool_blocks.append(content)
+                        tools_used.append(content.name)
+
+                # Actualizar progreso con las herramientas a ejecutar
+                names_preview = ", ".join(c.name for c in tool_blocks)
+                self.ui.update_progress_status(progress, task, f"Ejecutando: {names_preview}", "yellow")
+
+                async def run_tool(content):
+                    """Ejecuta un tool_use y devuelve (tool_result, result_text, error)."""
+                    tool_name = content.name
+                    tool_args = content.input or {}
+                    try:
+                        # Manejar lectura de recursos MCP
+                        if tool_name == "read_mcp_resource":
+                            resource_uri = tool_args.get("uri")
+                            resource_result = await self.session.read_resource(resource_uri)
+                            result_text = (
+                                resource_result.contents[0].text
+                                if resource_result.contents and hasattr(resource_result.contents[0], "text")
+                                else str(resource_result.contents)
+                            )
+                        else:
+                            # Ejecutar la herramienta MCP normal
+                            tool_result = await self.session.call_tool(tool_name, tool_args)
+                            result_text = (
+                                tool_result.content[0].text
+                                if tool_result.content and hasattr(tool_result.content[0], "text")
+                                else str(tool_result.content)
+                            )
+
+                        return ({
+                            "type": "tool_result",
+                            "tool_use_id": content.id,
+                            "content": result_text
+                        }, result_text, None)
+
+                    except Exception as e:
+                        return ({
+                            "type": "tool_result",
+                            "tool_use_id": content.id,
+                            "content": f"Error: {str(e)}",
+                            "is_error": True
+                        }, None, e)
+
+                # Las tool calls de un mismo turno son independientes entre si:
+                # ejecutarlas en paralelo deja la latencia total en el maximo
+                # de las herramientas en vez de la suma
+                outcomes = await asyncio.gather(*(run_tool(c) for c in tool_blocks))
+
+                # Mostrar resultados en el orden original de los content blocks
+                for content, (result, result_text, error) in zip(tool_blocks, outcomes):
+                    if error is not None:
+                        self.ui.show_error(error, f"Al ejecutar herramienta '{content.name}'")
+                    else:
+                        # Detectar y mostrar visualización mejorada para fetch tools
+                        self._show_enhanced_fetch_result(content.name, result_text)
+                    tool_results.append(result)
 
                 # Finalizar progreso de herramientas
                 self.ui.update_progress_status(progress, task, f"Herramientas ejecutadas ({len(tools_used)} total)", "green")
@@ -287,7 +322,7 @@ class MCPClient:
                 task = progress.add_task("[cyan]Interpretando resultados...", total=None)
 
                 # Obtener respuesta final de Claude
-                followup = self.anthropic.messages.create(
+                followup = await self._messages_create(
                     model="claude-3-5-haiku-20241022",
                     max_tokens=4096,
                     messages=self.conversation_history,
@@ -296,12 +331,17 @@ class MCPClient:
                 # Actualizar estado
                 self.ui.update_progress_status(progress, task, "Respuesta generada exitosamente", "green")
 
-            # Guardar respuesta final en el historial
-            followup_content = []
-            for content in followup.content:
-                if content.type == "text":
-                    followup_content.append({"type": "text", "text": content.text})
-                    final_output.append(content.text)
+            # Guardar respuesta final en el historial (mismo fast path de
+            # string directo para el caso de un solo bloque de texto)
+            if len(followup.content) == 1 and followup.content[0].type == "text":
+                followup_content = followup.content[0].text
+                final_output.append(followup_content)
+            else:
+                followup_content = []
+                for content in followup.content:
+                    if content.type == "text":
+                        followup_content.append({"type": "text", "text": content.text})
+                        final_output.append(content.text)
 
             self.conversation_history.append({
                 "role": "assistant",
@@ -309,7 +349,13 @@ class MCPClient:
             })
 
         # Guardar en history_manager (Fase 3)
-        final_response = "\n".join(final_output) if final_output else "No response generated."
+        # Fast path: la gran mayoria de respuestas tiene un solo bloque de texto
+        if not final_output:
+            final_response = "No response generated."
+        elif len(final_output) == 1:
+            final_response = final_output[0]
+        else:
+            final_response = "\n".join(final_output)
         self.history_manager.add(
             query=query,
             response=final_response,
@@ -323,21 +369,9 @@ class MCPClient:
 
     def _show_enhanced_fetch_result(self, tool_name: str, result_text: str):
         """Detectar y mostrar visualización mejorada para herramientas de fetch."""
-        import json
-
-        # Lista de herramientas de fetch que tienen visualización mejorada
-        fetch_tools = {
-            "fetch_series_metadata_tool": "metadata",
-            "fetch_series_observations_tool": "observations",
-            "search_fred_series_tool": "search",
-            "fetch_fred_releases_tool": "releases",
-            "fetch_release_details_tool": "release_details",
-            "fetch_category_details_tool": "category_details",
-            "fetch_fred_sources_tool": "sources"
-        }
-
-        # Verificar si es una herramienta de fetch
-        if tool_name not in fetch_tools:
+        # Verificar si es una herramienta de fetch con visualizacion
+        show_visualization = self._fetch_visualizers.get(tool_name)
+        if show_visualization is None:
             return
 
         try:
@@ -349,22 +383,7 @@ class MCPClient:
                 return
 
             # Mostrar visualización según el tipo
-            viz_type = fetch_tools[tool_name]
-
-            if viz_type == "metadata":
-                self.ui.show_series_metadata(result_json)
-            elif viz_type == "observations":
-                self.ui.show_series_observations(result_json)
-            elif viz_type == "search":
-                self.ui.show_search_results(result_json)
-            elif viz_type == "releases":
-                self.ui.show_fred_releases(result_json)
-            elif viz_type == "release_details":
-                self.ui.show_release_details(result_json)
-            elif viz_type == "category_details":
-                self.ui.show_category_details(result_json)
-            elif viz_type == "sources":
-                self.ui.show_fred_sources(result_json)
+            show_visualization(result_json)
 
         except (json.JSONDecodeError, KeyError, Exception):
             # Si falla el parsing o no es el formato esperado, no hacer nada
@@ -391,7 +410,7 @@ class MCPClient:
                 # Detectar si es un comando
                 if consulta.startswith("/"):
                     result = await self.command_handler.execute(consulta)
-                    if result == "EXIT_REQUESTED":
+                    if result is CmdResult.EXIT:
                         break
                     self.ui.print()
                     continue
@@ -4,13 +4,30 @@ Handles slash commands like /help, /tools, /resources, etc.
 """
 
 from typing import Optional, Dict, Callable, Any
-from datetime import datetime
-import os
+from enum import IntEnum
+from pathlib import Path
+import asyncio
+import time
+
+
+class CmdResult(IntEnum):
+    """Resultado de la ejecucion de un comando.
+
+    Los callers deben comparar con identidad (ej: `result is CmdResult.EXIT`);
+    comparar enteros es mas barato que hashear y comparar strings en cada
+    iteracion del REPL.
+    """
+    OK = 0
+    ERROR = 1
+    EXIT = 2
+    NOT_FOUND = 3
 
 
 class Command:
     """Representa un comando del sistema."""
 
+    __slots__ = ('name', 'description', 'handler', 'aliases')
+
     def __init__(self, name: str, description: str, handler: Callable, aliases: list = None):
         self.name = name
         self.description = description
@@ -24,6 +41,8 @@ class CommandHandler:
     def __init__(self, client):
         self.client = client
         self.commands: Dict[str, Command] = {}
+        # Directorio de conversaciones precomputado como Path
+        self._conv_dir = Path("conversations")
         self._register_default_commands()
 
     def _register_default_commands(self):
@@ -146,16 +165,22 @@ class CommandHandler:
         cmd = Command(name, description, handler, aliases)
         self.commands[name] = cmd
 
-        # Registrar aliases
+        # Registrar aliases en un solo update a nivel C
         if aliases:
-            for alias in aliases:
-                self.commands[alias] = cmd
+            self.commands.update(dict.fromkeys(aliases, cmd))
+
+    def _default_filename(self, prefix: str) -> str:
+        """Genera un nombre de archivo por defecto con timestamp.
+
+        Usa time.strftime directamente (evita construir un datetime).
+        """
+        return f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}"
 
     def is_command(self, text: str) -> bool:
         """Verifica si el texto es un comando."""
         return text.startswith("/")
 
-    async def execute(self, text: str) -> Optional[str]:
+    async def execute(self, text: str) -> Optional["CmdResult"]:
         """Ejecuta un comando y retorna resultado o None."""
         if not self.is_command(text):
             return None
@@ -169,7 +194,7 @@ class CommandHandler:
         if cmd_name not in self.commands:
             self.client.ui.show_warning(f"Comando desconocido: /{cmd_name}")
             self.client.ui.show_info("Usa /help para ver comandos disponibles")
-            return "COMMAND_NOT_FOUND"
+            return CmdResult.NOT_FOUND
 
         # Ejecutar comando
         command = self.commands[cmd_name]
@@ -178,34 +203,38 @@ class CommandHandler:
             return result
         except Exception as e:
             self.client.ui.show_error(e, f"Al ejecutar comando /{cmd_name}")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
     # ==================== COMMAND HANDLERS ====================
 
-    async def cmd_help(self, args: str) -> str:
+    async def cmd_help(self, args: str) -> "CmdResult":
         """Muestra ayuda de comandos."""
         self.client.ui.show_commands_help(self.get_primary_commands())
-        return "COMMAND_EXECUTED"
+        return CmdResult.OK
 
-    async def cmd_tools(self, args: str) -> str:
+    async def cmd_tools(self, args: str) -> "CmdResult":
         """Lista herramientas disponibles o muestra detalles de una herramienta específica."""
+        args = args.strip()
         try:
             response = await self.client.session.list_tools()
             tools = response.tools
 
             if not tools:
                 self.client.ui.show_warning("No hay herramientas disponibles")
-                return "COMMAND_EXECUTED"
+                return CmdResult.OK
 
             # Si se especifica un nombre de tool, mostrar detalles
-            if args.strip():
-                tool_name = args.strip()
-                tool = next((t for t in tools if t.name == tool_name), None)
+            if args:
+                tool_name = args
+                # Indice por nombre: un dict-comprehension es mas rapido que
+                # recorrer la lista con next(), sobre todo en el caso de miss
+                tools_by_name = {t.name: t for t in tools}
+                tool = tools_by_name.get(tool_name)
 
                 if not tool:
                     self.client.ui.show_warning(f"Tool no encontrada: {tool_name}")
                     self.client.ui.show_info(f"Usa /tools para ver todas las herramientas disponibles")
-                    return "COMMAND_EXECUTED"
+                    return CmdResult.OK
 
                 # Mostrar detalles de la tool específica
                 self.client.ui.show_tool_details(tool)
@@ -213,32 +242,34 @@ class CommandHandler:
                 # Listar todas las tools
                 self.client.ui.show_tools_list(tools)
 
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except Exception as e:
             self.client.ui.show_error(e, "Al listar herramientas")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_resources(self, args: str) -> str:
+    async def cmd_resources(self, args: str) -> "CmdResult":
         """Lista recursos disponibles o lee un recurso específico."""
+        args = args.strip()
         try:
             response = await self.client.session.list_resources()
             resources = response.resources
 
             if not resources:
                 self.client.ui.show_warning("No hay recursos disponibles")
-                return "COMMAND_EXECUTED"
+                return CmdResult.OK
 
             # Si se especifica un URI, leer ese recurso
-            if args.strip():
-                resource_uri = args.strip()
+            if args:
+                resource_uri = args
 
-                # Verificar que el URI existe
-                resource = next((r for r in resources if str(r.uri) == resource_uri), None)
+                # Verificar que el URI existe (indice por URI en vez de scan lineal)
+                resources_by_uri = {str(r.uri): r for r in resources}
+                resource = resources_by_uri.get(resource_uri)
 
                 if not resource:
                     self.client.ui.show_warning(f"Recurso no encontrado: {resource_uri}")
                     self.client.ui.show_info(f"Usa /resources para ver todos los recursos disponibles")
-                    return "COMMAND_EXECUTED"
+                    return CmdResult.OK
 
                 # Leer el recurso
                 self.client.ui.show_info(f"Leyendo recurso: {resource_uri}")
@@ -257,35 +288,35 @@ class CommandHandler:
 
                 except Exception as e:
                     self.client.ui.show_error(e, f"Al leer recurso '{resource_uri}'")
-                    return "COMMAND_ERROR"
+                    return CmdResult.ERROR
             else:
                 # Listar todos los recursos
                 self.client.ui.show_resources_list(resources)
 
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except Exception as e:
             self.client.ui.show_error(e, "Al listar recursos")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_clear(self, args: str) -> str:
+    async def cmd_clear(self, args: str) -> "CmdResult":
         """Limpia la pantalla."""
         self.client.ui.clear_screen()
-        return "COMMAND_EXECUTED"
+        return CmdResult.OK
 
-    async def cmd_history(self, args: str) -> str:
+    async def cmd_history(self, args: str) -> "CmdResult":
         """Muestra historial de conversacion."""
         if not self.client.conversation_history:
             self.client.ui.show_info("El historial esta vacio")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
 
         self.client.ui.show_conversation_history(self.client.conversation_history)
-        return "COMMAND_EXECUTED"
+        return CmdResult.OK
 
-    async def cmd_new(self, args: str) -> str:
+    async def cmd_new(self, args: str) -> "CmdResult":
         """Inicia nueva conversacion."""
         if not self.client.conversation_history:
             self.client.ui.show_info("El historial ya esta vacio")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
 
         # Guardar cantidad de mensajes antes de limpiar
         msg_count = len(self.client.conversation_history)
@@ -295,9 +326,9 @@ class CommandHandler:
 
         self.client.ui.show_success(f"Historial limpiado ({msg_count} mensajes eliminados)")
         self.client.ui.show_info("Nueva conversacion iniciada")
-        return "COMMAND_EXECUTED"
+        return CmdResult.OK
 
-    async def cmd_status(self, args: str) -> str:
+    async def cmd_status(self, args: str) -> "CmdResult":
         """Muestra estado del cliente."""
         try:
             # Obtener informacion del servidor
@@ -321,114 +352,126 @@ class CommandHandler:
                 history_count=history_count
             )
 
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except Exception as e:
             self.client.ui.show_error(e, "Al obtener estado del cliente")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_save(self, args: str) -> str:
+    async def cmd_save(self, args: str) -> "CmdResult":
         """Guarda la conversacion actual."""
+        args = args.strip()
         if not hasattr(self.client, 'history_manager'):
             self.client.ui.show_error(Exception("History manager not initialized"), "")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
         if len(self.client.history_manager) == 0:
             self.client.ui.show_warning("No hay conversaciones para guardar")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
 
         # Usar filename del argumento o generar uno por defecto
-        filename = args.strip() if args.strip() else f"conversation_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        filename = args if args else self._default_filename("conversation")
 
         try:
-            filepath = self.client.history_manager.export_json(filename)
+            # El write es bloqueante: a un thread para no frenar el event loop
+            filepath = await asyncio.to_thread(
+                self.client.history_manager.export_json, filename
+            )
             self.client.ui.show_success(f"Conversacion guardada en: {filepath}")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except Exception as e:
             self.client.ui.show_error(e, "Al guardar conversacion")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_load(self, args: str) -> str:
+    async def cmd_load(self, args: str) -> "CmdResult":
         """Carga una conversacion guardada."""
+        args = args.strip()
         if not hasattr(self.client, 'history_manager'):
             self.client.ui.show_error(Exception("History manager not initialized"), "")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-        if not args.strip():
+        if not args:
             self.client.ui.show_warning("Debes especificar el nombre del archivo")
             self.client.ui.show_info("Uso: /load <nombre_archivo>")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
 
-        filename = args.strip()
+        filename = args
         # Add .json extension if not present
         if not filename.endswith('.json'):
             filename = f"{filename}.json"
 
-        filepath = os.path.join("conversations", filename)
+        filepath = self._conv_dir / filename
 
         try:
-            count = self.client.history_manager.load_json(filepath)
+            count = await asyncio.to_thread(
+                self.client.history_manager.load_json, str(filepath)
+            )
             self.client.ui.show_success(f"Conversacion cargada: {count} items")
             self.client.ui.show_info(f"Archivo: {filepath}")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except FileNotFoundError:
             self.client.ui.show_error(FileNotFoundError(f"Archivo no encontrado: {filepath}"), "")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
         except Exception as e:
             self.client.ui.show_error(e, "Al cargar conversacion")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_export(self, args: str) -> str:
+    async def cmd_export(self, args: str) -> "CmdResult":
         """Exporta la conversacion en formato especificado."""
         if not hasattr(self.client, 'history_manager'):
             self.client.ui.show_error(Exception("History manager not initialized"), "")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
         if len(self.client.history_manager) == 0:
             self.client.ui.show_warning("No hay conversaciones para exportar")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
 
         # Parse args: formato [nombre]
         parts = args.strip().split(maxsplit=1)
         formato = parts[0].lower() if parts else "md"
-        filename = parts[1] if len(parts) > 1 else f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        filename = parts[1] if len(parts) > 1 else self._default_filename("export")
 
         if formato not in ["md", "json", "markdown"]:
             self.client.ui.show_warning(f"Formato no valido: {formato}")
             self.client.ui.show_info("Formatos disponibles: md, json")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
 
         try:
             if formato in ["md", "markdown"]:
-                filepath = self.client.history_manager.export_markdown(filename)
+                filepath = await asyncio.to_thread(
+                    self.client.history_manager.export_markdown, filename
+                )
             else:
-                filepath = self.client.history_manager.export_json(filename)
+                filepath = await asyncio.to_thread(
+                    self.client.history_manager.export_json, filename
+                )
 
             self.client.ui.show_success(f"Conversacion exportada en formato {formato.upper()}")
             self.client.ui.show_info(f"Archivo: {filepath}")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except Exception as e:
             self.client.ui.show_error(e, "Al exportar conversacion")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_search(self, args: str) -> str:
+    async def cmd_search(self, args: str) -> "CmdResult":
         """Busca en el historial por palabra clave."""
+        args = args.strip()
         if not hasattr(self.client, 'history_manager'):
             self.client.ui.show_error(Exception("History manager not initialized"), "")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-        if not args.strip():
+        if not args:
             self.client.ui.show_warning("Debes especificar una palabra clave")
             self.client.ui.show_info("Uso: /search <keyword>")
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
 
-        keyword = args.strip()
+        keyword = args
 
         try:
             results = self.client.history_manager.search(keyword)
 
             if not results:
                 self.client.ui.show_info(f"No se encontraron resultados para: '{keyword}'")
-                return "COMMAND_EXECUTED"
+                return CmdResult.OK
 
             # Mostrar resultados
             self.client.ui.print()
@@ -450,26 +493,26 @@ class CommandHandler:
                 self.client.ui.print(f"   [dim]Response:[/dim] {response_preview}")
                 self.client.ui.print()
 
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except Exception as e:
             self.client.ui.show_error(e, "Al buscar en historial")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_stats(self, args: str) -> str:
+    async def cmd_stats(self, args: str) -> "CmdResult":
         """Muestra estadisticas de uso y conversaciones."""
         if not hasattr(self.client, 'history_manager'):
             self.client.ui.show_error(Exception("History manager not initialized"), "")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
         try:
             stats = self.client.history_manager.get_stats()
             self.client.ui.show_stats(stats)
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except Exception as e:
             self.client.ui.show_error(e, "Al obtener estadisticas")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_examples(self, args: str) -> str:
+    async def cmd_examples(self, args: str) -> "CmdResult":
         """Muestra ejemplos de consultas interactivas."""
         try:
             # Obtener herramientas disponibles
@@ -478,19 +521,19 @@ class CommandHandler:
 
             if not tools:
                 self.client.ui.show_warning("No hay herramientas disponibles para generar ejemplos")
-                return "COMMAND_EXECUTED"
+                return CmdResult.OK
 
             # Mostrar ejemplos basados en herramientas
             self.client.ui.show_examples(tools)
 
-            return "COMMAND_EXECUTED"
+            return CmdResult.OK
         except Exception as e:
             self.client.ui.show_error(e, "Al generar ejemplos")
-            return "COMMAND_ERROR"
+            return CmdResult.ERROR
 
-    async def cmd_exit(self, args: str) -> str:
+    async def cmd_exit(self, args: str) -> "CmdResult":
         """Sale del cliente."""
-        return "EXIT_REQUESTED"
+        return CmdResult.EXIT
 
     def get_primary_commands(self) -> list:
         """Obtiene lista de comandos primarios (sin aliases)."""
@@ -3,21 +3,49 @@ GUI Backend Module
 Automatic detection and management of GUI backends for plot display
 Supports: Tkinter, PyQt5, Jupyter, VS Code
 """
+import functools
 import os
 import sys
 import platform
 import subprocess
 import logging
-import tempfile
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
-# Windows-specific flag to prevent console window
-if platform.system() == 'Windows':
+# Windows-specific launch constants, resolved once at import: the platform,
+# the hidden-window STARTUPINFO, the creation flags and the pythonw.exe path
+# never change during the process, so the viewer launch path just reads them
+_IS_WINDOWS = platform.system() == 'Windows'
+if _IS_WINDOWS:
     CREATE_NO_WINDOW = 0x08000000
+    _CREATE_FLAGS = CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+    _STARTUPINFO = subprocess.STARTUPINFO()
+    _STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _STARTUPINFO.wShowWindow = subprocess.SW_HIDE
+    # Prefer pythonw.exe so the daemon never flashes a console
+    _PYTHONW_EXE = sys.executable.replace('python.exe', 'pythonw.exe')
+    if not os.path.exists(_PYTHONW_EXE):
+        _PYTHONW_EXE = sys.executable
 else:
     CREATE_NO_WINDOW = 0
+    _CREATE_FLAGS = 0
+    _STARTUPINFO = None
+    _PYTHONW_EXE = sys.executable
+
+# Static viewer script shipped next to this module: launching it directly
+# avoids writing a generated script to a temp file on every image open
+_TK_VIEWER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_tk_viewer.py')
+
+# Display availability is a process-wide constant: decide it once at import
+# from sys.platform (no syscall) instead of calling platform.uname() per
+# probe. Windows and macOS always have a GUI; on Linux only DISPLAY matters
+# (the old SSH-without-X and WSL-without-X branches all answered False too).
+_HAS_DISPLAY = (
+    sys.platform.startswith('win')
+    or sys.platform == 'darwin'
+    or bool(os.environ.get('DISPLAY'))
+)
 
 
 class GUIBackend:
@@ -25,6 +53,11 @@ class GUIBackend:
     
     def __init__(self):
         """Initialize GUI backend with auto-detection"""
+        # Environment probes (platform, DISPLAY, IPython) never change during
+        # the process lifetime: compute them once and serve cached values
+        self._platform = platform.system()
+        self._is_jupyter_cached = self._probe_jupyter()
+        self._is_vscode_cached = os.getenv('TERM_PROGRAM') == 'vscode'
         self.backend = self._detect_backend()
         self.current_process = None  # Track current subprocess
         logger.info(f"GUI Backend detected: {self.backend or 'None'}")
@@ -74,33 +107,8 @@ class GUIBackend:
         logger.warning("No GUI backend available")
         return None
     
-    def _has_display(self) -> bool:
-        """Check if display/GUI is available"""
-        # Windows always has GUI
-        if platform.system() == 'Windows':
-            return True
-        
-        # macOS always has GUI
-        if platform.system() == 'Darwin':
-            return True
-        
-        # Linux: Check DISPLAY variable
-        if os.environ.get('DISPLAY'):
-            return True
-        
-        # Check if in SSH without X forwarding
-        if os.environ.get('SSH_CONNECTION') and not os.environ.get('DISPLAY'):
-            return False
-        
-        # WSL2 check
-        if 'microsoft' in platform.uname().release.lower():
-            if not os.environ.get('DISPLAY'):
-                return False
-        
-        return False
-    
-    def _is_jupyter(self) -> bool:
-        """Check if running in Jupyter notebook"""
+    def _probe_jupyter(self) -> bool:
+        """Probe whether running in a Jupyter notebook (run once at init)"""
         try:
             from IPython import get_ipython
             ipython = get_ipython()
@@ -109,10 +117,18 @@ class GUIBackend:
         except ImportError:
             pass
         return False
-    
+
+    def _has_display(self) -> bool:
+        """Check if display/GUI is available"""
+        return _HAS_DISPLAY
+
+    def _is_jupyter(self) -> bool:
+        """Check if running in Jupyter notebook"""
+        return self._is_jupyter_cached
+
     def _is_vscode(self) -> bool:
         """Check if running in VS Code terminal"""
-        return os.getenv('TERM_PROGRAM') == 'vscode'
+        return self._is_vscode_cached
     
     def can_display_gui(self) -> bool:
         """Check if GUI display is possible"""
@@ -137,9 +153,11 @@ class GUIBackend:
             logger.warning("No GUI backend available")
             return False
         
-        # Close previous window if exists
-        self._close_current_window()
-        
+        # Close previous window if exists (the tkinter daemon reuses its own
+        # window, so it must stay alive between opens)
+        if self.backend != "tkinter":
+            self._close_current_window()
+
         # Route to appropriate backend
         try:
             if self.backend == "tkinter":
@@ -167,123 +185,81 @@ class GUIBackend:
             finally:
                 self.current_process = None
     
+    def _send_to_viewer(self, request: bytes) -> bool:
+        """Send a display request to the running viewer daemon, if any"""
+        proc = self.current_process
+        if not proc or proc.poll() is not None or not proc.stdin:
+            return False
+        try:
+            proc.stdin.write(request)
+            proc.stdin.flush()
+            return True
+        except (OSError, ValueError):
+            # Daemon murió o cerró el pipe: se relanza en el próximo open
+            self.current_process = None
+            return False
+
     def _open_with_tkinter_subprocess(self, image_path: str, title: Optional[str] = None) -> bool:
         """
-        Open image using Tkinter in completely detached subprocess
-        
+        Open image using Tkinter viewer daemon in detached subprocess
+
+        The first open spawns _tk_viewer.py in --daemon mode, which keeps
+        tkinter imported and reads requests from stdin; every later open
+        is just a pipe write instead of a fresh interpreter launch.
+
         Args:
             image_path: Path to image
             title: Window title
-            
+
         Returns:
             True if successful
         """
         try:
-            # ==================== SUBPROCESS SCRIPT ====================
-            # Script runs in completely isolated process
-            script = f'''
-import sys
-import os
+            request = "{}\t{}\n".format(
+                image_path,
+                title or f"Plot Preview - {os.path.basename(image_path)}",
+            ).encode('utf-8')
 
-# CRITICAL: Redirect ALL output immediately
-sys.stdout = open(os.devnull, 'w')
-sys.stderr = open(os.devnull, 'w')
+            # Daemon ya corriendo: mostrar la imagen cuesta un write al pipe
+            if self._send_to_viewer(request):
+                logger.debug(f"Sent image to running viewer daemon: {os.path.basename(image_path)}")
+                return True
 
-# Now import GUI libraries (no output possible)
-try:
-    import tkinter as tk
-    from PIL import Image, ImageTk
-except ImportError:
-    sys.exit(1)
+            viewer_args = [_TK_VIEWER_SCRIPT, '--daemon']
 
-try:
-    root = tk.Tk()
-    root.title({repr(title or f"Plot Preview - {os.path.basename(image_path)}")})
-    
-    img = Image.open({repr(image_path)})
-    
-    max_width, max_height = 1200, 800
-    if img.width > max_width or img.height > max_height:
-        ratio = min(max_width / img.width, max_height / img.height)
-        new_size = (int(img.width * ratio), int(img.height * ratio))
-        img = img.resize(new_size, Image.Resampling.LANCZOS)
-    
-    photo = ImageTk.PhotoImage(img)
-    
-    label = tk.Label(root, image=photo)
-    label.image = photo
-    label.pack()
-    
-    btn_frame = tk.Frame(root)
-    btn_frame.pack(pady=5)
-    
-    close_btn = tk.Button(btn_frame, text="Close (ESC)", command=root.destroy, padx=20, pady=5)
-    close_btn.pack()
-    
-    root.bind('<Escape>', lambda e: root.destroy())
-    
-    root.update_idletasks()
-    width = root.winfo_width()
-    height = root.winfo_height()
-    x = (root.winfo_screenwidth() // 2) - (width // 2)
-    y = (root.winfo_screenheight() // 2) - (height // 2)
-    root.geometry(f'{{width}}x{{height}}+{{x}}+{{y}}')
-    
-    root.mainloop()
-    
-except Exception:
-    sys.exit(1)
-'''
-            # ==================== END SCRIPT ====================
-            
-            # Create temp file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
-                f.write(script)
-                temp_script = f.name
-            
-            logger.debug(f"Created temp script: {temp_script}")
-            
             # ==================== COMPLETE ISOLATION ====================
-            if platform.system() == 'Windows':
-                # Windows: Use pythonw.exe + CREATE_NO_WINDOW
-                python_exe = sys.executable.replace('python.exe', 'pythonw.exe')
-                if not os.path.exists(python_exe):
-                    python_exe = sys.executable
-                
-                # STARTUPINFO to hide window
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-                
+            if _IS_WINDOWS:
+                # Windows: pythonw.exe + hidden-window constants del modulo
                 self.current_process = subprocess.Popen(
-                    [python_exe, temp_script],
+                    [_PYTHONW_EXE] + viewer_args,
                     stdout=subprocess.DEVNULL,       # No stdout inheritance
                     stderr=subprocess.DEVNULL,       # No stderr inheritance
-                    stdin=subprocess.DEVNULL,        # No stdin inheritance
-                    creationflags=CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS,
-                    startupinfo=startupinfo,
+                    stdin=subprocess.PIPE,           # Request channel to daemon
+                    creationflags=_CREATE_FLAGS,
+                    startupinfo=_STARTUPINFO,
                     close_fds=True,
                     shell=False
                 )
             else:
                 # Linux/macOS: Use setsid for complete detachment
                 self.current_process = subprocess.Popen(
-                    [sys.executable, temp_script],
+                    [sys.executable] + viewer_args,
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL,
-                    stdin=subprocess.DEVNULL,
+                    stdin=subprocess.PIPE,
                     start_new_session=True,
                     close_fds=True,
                     preexec_fn=os.setsid if hasattr(os, 'setsid') else None,
                     shell=False
                 )
             # ==================== END ISOLATION ====================
-            
-            logger.info(f"✅ GUI window launched safely (detached from TUI): {os.path.basename(image_path)}")
+
+            logger.info(f"✅ GUI viewer daemon launched (detached from TUI): {os.path.basename(image_path)}")
             logger.debug(f"Process PID: {self.current_process.pid}")
-            
-            return True
-            
+
+            # Primer pedido al daemon recién lanzado
+            return self._send_to_viewer(request)
+
         except Exception as e:
             logger.error(f"Failed to launch GUI window: {e}", exc_info=True)
             return False
@@ -308,8 +284,21 @@ except Exception:
     def _open_with_vscode(self, image_path: str) -> bool:
         """Open image in VS Code image viewer"""
         try:
-            subprocess.run(['code', '--goto', image_path], check=True)
-            
+            # Popen en vez de run(check=True): el launcher `code` (en Windows
+            # un .cmd que levanta Node) puede tardar cientos de ms y no hay
+            # motivo para bloquear al caller; VS Code abre la imagen solo.
+            # No se guarda en current_process para que el proximo open no
+            # mate al launcher a mitad del handoff.
+            subprocess.Popen(
+                ['code', '--goto', image_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                close_fds=True,
+                startupinfo=_STARTUPINFO,
+                creationflags=_CREATE_FLAGS,
+            )
+
             logger.info(f"Opened image in VS Code: {os.path.basename(image_path)}")
             return True
         except Exception as e:
@@ -326,20 +315,15 @@ except Exception:
             "is_vscode": self._is_vscode(),
             "process_active": self.current_process is not None and self.current_process.poll() is None,
             "process_pid": self.current_process.pid if self.current_process else None,
-            "platform": platform.system(),
+            "platform": self._platform,
         }
 
-_gui_backend = None
-
-# Singleton instance
-_gui_backend = None
-
+# Singleton instance: functools.cache hace el lookup en C y es thread-safe
+# bajo el GIL, sin global mutable ni chequeo de None en cada llamada
+@functools.cache
 def get_gui_backend() -> GUIBackend:
     """Get or create singleton GUI backend instance"""
-    global _gui_backend
-    if _gui_backend is None:
-        _gui_backend = GUIBackend()
-    return _gui_backend
+    return GUIBackend()
 
 # Convenience function
 def can_display_gui() -> bool:
@@ -3,12 +3,26 @@ Macro MCP - Textual TUI Application
 Modern Terminal User Interface for Economic Analysis
 """
 import asyncio
+import importlib.util
 import os
+import reprlib
 import sys
+import time
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 import json
+from itertools import islice
+
+# orjson (parser JSON en C) si está instalado: los resultados de tools y los
+# argumentos de tool calls de OpenAI se decodifican en cada turno. Lanza
+# orjson.JSONDecodeError, subclase de json.JSONDecodeError, así que los
+# except existentes siguen funcionando.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 from textual.app import App, ComposeResult
 from textual.binding import Binding
@@ -30,7 +44,7 @@ from textual.reactive import reactive
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 from contextlib import AsyncExitStack
 
@@ -43,6 +57,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class _SilenceLogs:
+    """Context manager que descarta todos los logs mientras está activo.
+
+    Reemplaza el viejo toggle de logging.root.setLevel: cambiar el nivel
+    del root muta estado global del proceso, invalida el cache de nivel
+    efectivo de todos los loggers y pisa el nivel restaurado si dos tool
+    calls se solapan. Un filtro en los handlers del root descarta los
+    records igual de bien y solo vive lo que dura el bloque.
+    """
+
+    @staticmethod
+    def _drop(record):
+        return False
+
+    def __enter__(self):
+        for handler in logging.root.handlers:
+            handler.addFilter(self._drop)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for handler in logging.root.handlers:
+            handler.removeFilter(self._drop)
+        return False
+
+
 # NEW: Import GUI backend (v0.4.0)
 try:
     from gui_backend import get_gui_backend, can_display_gui
@@ -54,21 +94,17 @@ except ImportError as e:
     can_display_gui = lambda: False
     logger.warning(f"⚠️ GUI backend not available: {e}")
 
-# Import Google Gemini
+# Disponibilidad de los SDKs opcionales sin pagar su import en el arranque:
+# find_spec solo consulta los finders, no ejecuta el modulo (el de Gemini
+# arrastra grpc/protobuf y el de OpenAI httpx/pydantic). El import real se
+# hace en _initialize_llm y solo para el proveedor con API key configurada.
 try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
+    # find_spec sobre un submodulo lanza ModuleNotFoundError si falta el padre
+    GEMINI_AVAILABLE = importlib.util.find_spec("google.generativeai") is not None
+except ModuleNotFoundError:
     GEMINI_AVAILABLE = False
-    genai = None
-
-# Import OpenAI
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    OpenAI = None
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+genai = None
 
 load_dotenv()
 
@@ -164,17 +200,88 @@ LLM_PROVIDERS = {
     }
 }
 
+# Los schemas de tools no cambian durante la sesión: memoizar el dump
+# indentado por identidad del dict evita re-serializar el mismo schema cada
+# vez que se piden detalles con /tools <nombre>
+_schema_cache = {}
+
+
+def _dump_schema(schema) -> str:
+    """json.dumps(schema, indent=2) memoizado por identidad del schema."""
+    key = id(schema)
+    cached = _schema_cache.get(key)
+    if cached is None or cached[0] is not schema:
+        if len(_schema_cache) > 128:
+            _schema_cache.clear()
+        dumped = json.dumps(schema, indent=2)
+        _schema_cache[key] = (schema, dumped)
+        return dumped
+    return cached[1]
+
+
+# Recorte de valores para el preview de tool calls: reprlib trunca mientras
+# construye la representación, sin materializar str(v) completo cuando el
+# argumento es un dict/lista grande
+_arg_repr = reprlib.Repr()
+_arg_repr.maxstring = 20
+_arg_repr.maxother = 20
+_arg_repr.maxlist = 1
+_arg_repr.maxdict = 1
+
+
+def _short_arg(value) -> str:
+    """Versión corta de un argumento de tool para mostrar en el chat."""
+    if isinstance(value, str):
+        return value[:20]
+    return _arg_repr.repr(value)
+
+
+# strftime tiene resolución de 1 segundo acá: memoizar el último resultado
+# hace que una ráfaga de mensajes en el mismo segundo pague una sola llamada
+# a libc en vez de una por mensaje
+_ts_cache = [0, ""]
+
+
+def _now_hms() -> str:
+    """Hora actual formateada HH:MM:SS, memoizada por segundo."""
+    t = int(time.time())
+    if _ts_cache[0] != t:
+        _ts_cache[0] = t
+        _ts_cache[1] = time.strftime("%H:%M:%S", time.localtime(t))
+    return _ts_cache[1]
+
+
 class ChatPanel(VerticalScroll):
     """Panel principal de chat"""
 
+    # Estilo por rol resuelto con un lookup en vez de cuatro ternarios:
+    # (icono, nombre, clase de header, clase de contenido)
+    _ROLE_STYLES = {
+        "user": ("🧑", "You", "user-header", "user-content"),
+        "assistant": ("🤖", "Claude", "assistant-header", "assistant-content"),
+    }
+
+    # Tope de mensajes montados: en sesiones largas los widgets (y su
+    # markdown parseado) no deben acumularse sin límite
+    MAX_MESSAGES = 500
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.messages = []
-        self.message_timestamps = {}  # Store timestamps for relative calculation
-
-    def _get_relative_time(self, message_time: datetime) -> str:
-        """Calculate relative time string from message timestamp"""
-        now = datetime.now()
+        # Datos por mensaje para el refresco de tiempos relativos, como lista
+        # de tuplas (time, abs, prefix, header): el loop periódico desempaqueta
+        # directo en vez de hacer lookups de dict por mensaje
+        self.message_timestamps = []
+        self._pending_scroll = False
+
+    def _get_relative_time(self, message_time: datetime, now: datetime = None) -> str:
+        """Calculate relative time string from message timestamp
+
+        El tick periódico pasa `now` ya calculado para no construir un
+        datetime por mensaje.
+        """
+        if now is None:
+            now = datetime.now()
         delta = now - message_time
         
         if delta < timedelta(seconds=10):
@@ -197,54 +304,61 @@ class ChatPanel(VerticalScroll):
     def add_message(self, role: str, content: str):
         """Agregar un nuevo mensaje al chat"""
         message_time = datetime.now()
-        timestamp_abs = message_time.strftime("%H:%M:%S")
+        timestamp_abs = _now_hms()
         timestamp_rel = self._get_relative_time(message_time)
         
-        icon = "🧑" if role == "user" else "🤖"
-        role_name = "You" if role == "user" else "Claude"
-        
-        # Crear widgets directamente sin contenedor
-        header_class = "user-header" if role == "user" else "assistant-header"
-        content_class = "user-content" if role == "user" else "assistant-content"
-        
+        icon, role_name, header_class, content_class = self._ROLE_STYLES.get(
+            role, self._ROLE_STYLES["assistant"]
+        )
+
         # Header with relative and absolute time
-        header_text = f"{icon} {role_name} • {timestamp_rel} ({timestamp_abs})"
+        prefix = f"{icon} {role_name}"
+        header_text = f"{prefix} • {timestamp_rel} ({timestamp_abs})"
         header = Label(header_text, classes=header_class)
         message_widget = Markdown(content, classes=content_class)
-        
-        # Store timestamp for future relative time updates
-        message_id = len(self.messages)
-        self.message_timestamps[message_id] = {
-            "time": message_time,
-            "header": header
-        }
-        
-        self.mount(header)
-        self.mount(message_widget)
+
+        # Store timestamp for future relative time updates (abs y prefix no
+        # cambian nunca: se guardan ya formateados; el último relativo
+        # mostrado va al final y es mutable para poder saltear updates)
+        self.message_timestamps.append([message_time, timestamp_abs, prefix, header, timestamp_rel])
+
+
+        # Un solo mount para ambos widgets: una sola pasada de layout
+        self.mount(header, message_widget)
         self.messages.extend([header, message_widget])
-        self.scroll_end(animate=True)
+
+        # Descartar el mensaje más viejo cuando se supera el tope
+        if len(self.message_timestamps) > self.MAX_MESSAGES:
+            self.message_timestamps.pop(0)
+            self.messages.pop(0).remove()
+            self.messages.pop(0).remove()
+
+        # Coalescer el scroll: en una ráfaga de tool output alcanza con un
+        # scroll_end por ventana de 50ms en vez de una animación por mensaje
+        if not self._pending_scroll:
+            self._pending_scroll = True
+            self.set_timer(0.05, self._flush_scroll)
+
+    def _flush_scroll(self) -> None:
+        """Ejecutar el scroll diferido acumulado por add_message."""
+        self._pending_scroll = False
+        self.scroll_end(animate=False)
 
     def update_relative_timestamps(self):
         """Update all relative timestamps (called periodically)"""
-        for msg_id, msg_data in self.message_timestamps.items():
-            message_time = msg_data["time"]
-            header_widget = msg_data["header"]
-            
-            timestamp_abs = message_time.strftime("%H:%M:%S")
-            timestamp_rel = self._get_relative_time(message_time)
-            
-            # Extract icon and role name from current header
-            current_text = header_widget.render()
-            if "🧑" in current_text:
-                icon = "🧑"
-                role_name = "You"
-            else:
-                icon = "🤖"
-                role_name = "Claude"
-            
-            # Update header text
-            new_header_text = f"{icon} {role_name} • {timestamp_rel} ({timestamp_abs})"
-            header_widget.update(new_header_text)
+        if not self.message_timestamps:
+            return
+
+        now = datetime.now()
+        for entry in self.message_timestamps:
+            message_time, timestamp_abs, prefix, header_widget, last_rel = entry
+            timestamp_rel = self._get_relative_time(message_time, now)
+            # Mismo texto que el tick anterior ("2h ago", fecha absoluta,
+            # etc.): no invalidar el render cache del widget al cuete
+            if timestamp_rel == last_rel:
+                continue
+            entry[4] = timestamp_rel
+            header_widget.update(f"{prefix} • {timestamp_rel} ({timestamp_abs})")
 
     def clear_messages(self):
         """Limpiar todos los mensajes"""
@@ -260,6 +374,8 @@ class DatasetPanel(VerticalScroll):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.datasets_info = []
+        self._datasets_widget = None  # cacheado en el primer update
+        self._last_datasets_text = None
 
     def compose(self) -> ComposeResult:
         yield Label("📊 Recent Datasets", classes="panel-title")
@@ -269,7 +385,15 @@ class DatasetPanel(VerticalScroll):
 
     async def update_datasets(self, datasets_text: str):
         """Actualizar la lista de datasets"""
-        datasets_widget = self.query_one("#datasets-list", Static)
+        # El refresco periódico suele traer el mismo texto: si no cambió,
+        # no hay que tocar el widget ni re-renderizar
+        if datasets_text == self._last_datasets_text:
+            return
+        self._last_datasets_text = datasets_text
+
+        datasets_widget = self._datasets_widget
+        if datasets_widget is None:
+            datasets_widget = self._datasets_widget = self.query_one("#datasets-list", Static)
         datasets_widget.update(datasets_text)
 
 
@@ -279,6 +403,7 @@ class HistoryPanel(VerticalScroll):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.history_items = []
+        self._history_widget = None  # cacheado en el primer update
 
     def compose(self) -> ComposeResult:
         yield Label("📚 Conversation History", classes="panel-title")
@@ -289,14 +414,15 @@ class HistoryPanel(VerticalScroll):
     def update_history(self, history_items: list):
         """Actualizar la lista de historial"""
         self.history_items = history_items
-        history_widget = self.query_one("#history-list", Static)
-
-        # Formatear items del historial
-        history_text = ""
-        for i, item in enumerate(history_items[-10:], 1):  # Últimos 10
-            timestamp = item.get('timestamp', 'Unknown')
-            query = item.get('query', '')[:50]  # Truncar a 50 chars
-            history_text += f"\n{i}. {timestamp}\n   {query}...\n"
+        history_widget = self._history_widget
+        if history_widget is None:
+            history_widget = self._history_widget = self.query_one("#history-list", Static)
+
+        # Formatear items del historial (join en vez de += cuadrático)
+        history_text = "".join(
+            f"\n{i}. {item.get('timestamp', 'Unknown')}\n   {item.get('query', '')[:50]}...\n"
+            for i, item in enumerate(history_items[-10:], 1)  # Últimos 10
+        )
 
         history_widget.update(history_text or "No history yet")
 
@@ -310,9 +436,26 @@ class StatusBar(Static):
     message_count = reactive(0)
     current_model = reactive("")
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Último render cacheado: Textual puede repintar sin que cambie
+        # ningún reactive y el string no necesita reconstruirse
+        self._last_key = None
+        self._last_render = ""
+
     def render(self) -> str:
-        model_display = f" | 🤖 {self.current_model}" if self.current_model else ""
-        return f"{self.connection_status} | 🔧 {self.tools_count} tools | 📦 {self.resources_count} resources | 💬 {self.message_count} messages{model_display}"
+        key = (
+            self.connection_status,
+            self.tools_count,
+            self.resources_count,
+            self.message_count,
+            self.current_model,
+        )
+        if key != self._last_key:
+            model_display = f" | 🤖 {key[4]}" if key[4] else ""
+            self._last_render = f"{key[0]} | 🔧 {key[1]} tools | 📦 {key[2]} resources | 💬 {key[3]} messages{model_display}"
+            self._last_key = key
+        return self._last_render
 
 
 class MacroMCPApp(App):
@@ -453,6 +596,10 @@ class MacroMCPApp(App):
         self.anthropic_client = None
         self.openai_client = None
         self.gemini_model = None
+        # Métodos create ligados una sola vez (evita resolver la cadena de
+        # atributos del SDK en cada request)
+        self._anthropic_create = None
+        self._openai_create = None
         
         # Initialize LLM
         self._initialize_llm()
@@ -461,6 +608,7 @@ class MacroMCPApp(App):
         self.conversation_history = []
         self.history_manager = ConversationHistory(max_items=100)
         self.cache = ResourceCache(ttl=300)
+        self._openai_tools_cache = None
 
         # State
         self.tools_available = []
@@ -468,6 +616,13 @@ class MacroMCPApp(App):
         self.sidebar_visible = True
         self.current_tab = "datasets"
 
+        # Referencias cacheadas a widgets (query_one recorre el DOM y chequea
+        # tipos en cada llamada; los paneles no cambian tras compose)
+        self._chat_panel = None
+        self._status_bar = None
+        self._dataset_panel = None
+        self._history_panel = None
+
         # GUI backend (v0.4.0)
         if GUI_BACKEND_AVAILABLE:
             try:
@@ -481,30 +636,71 @@ class MacroMCPApp(App):
             self.gui_backend = None
             logger.warning("GUI backend not available")
 
+    @property
+    def chat_panel(self) -> ChatPanel:
+        """Panel de chat, resuelto una sola vez tras el montaje."""
+        panel = self._chat_panel
+        if panel is None:
+            panel = self._chat_panel = self.query_one("#chat-panel", ChatPanel)
+        return panel
+
+    @property
+    def status_bar(self) -> StatusBar:
+        """Barra de estado, resuelta una sola vez tras el montaje."""
+        bar = self._status_bar
+        if bar is None:
+            bar = self._status_bar = self.query_one("#status-bar", StatusBar)
+        return bar
+
+    @property
+    def dataset_panel(self) -> DatasetPanel:
+        """Panel de datasets, resuelto una sola vez tras el montaje."""
+        panel = self._dataset_panel
+        if panel is None:
+            panel = self._dataset_panel = self.query_one("#dataset-panel", DatasetPanel)
+        return panel
+
+    @property
+    def history_panel(self) -> HistoryPanel:
+        """Panel de historial, resuelto una sola vez tras el montaje."""
+        panel = self._history_panel
+        if panel is None:
+            panel = self._history_panel = self.query_one("#history-panel", HistoryPanel)
+        return panel
+
     def _initialize_llm(self):
         """Initialize LLM clients and set default model"""
         # Get API keys
         anthropic_key = os.getenv("ANTHROPIC_API_KEY")
         openai_key = os.getenv("OPENAI_API_KEY")
         gemini_key = os.getenv("GEMINI_API_KEY")
+
+        # Las keys vienen del .env cargado al arranque y no cambian después:
+        # cachear el resultado evita repetir os.getenv en cada /model
+        self._gemini_key_available = bool(gemini_key)
         
         # Initialize Claude
         if anthropic_key:
             try:
-                self.anthropic_client = Anthropic(api_key=anthropic_key)
+                self.anthropic_client = AsyncAnthropic(api_key=anthropic_key)
+                self._anthropic_create = self.anthropic_client.messages.create
             except Exception as e:
                 self.anthropic_client = None
         
-        # Initialize OpenAI
+        # Initialize OpenAI (import perezoso: solo si hay key y paquete)
         if openai_key and OPENAI_AVAILABLE:
             try:
-                self.openai_client = OpenAI(api_key=openai_key)
+                from openai import AsyncOpenAI
+                self.openai_client = AsyncOpenAI(api_key=openai_key)
+                self._openai_create = self.openai_client.chat.completions.create
             except Exception as e:
                 self.openai_client = None
-        
-        # Initialize Gemini
+
+        # Initialize Gemini (import perezoso del SDK pesado)
         if gemini_key and GEMINI_AVAILABLE:
             try:
+                global genai
+                import google.generativeai as genai
                 genai.configure(api_key=gemini_key)
             except Exception as e:
                 pass
@@ -537,14 +733,15 @@ class MacroMCPApp(App):
 
     def _set_model(self, provider: str, model_key: str):
         """Set current model by provider and model key"""
-        if provider not in LLM_PROVIDERS:
+        # .get() combina chequeo de existencia y acceso en un solo lookup
+        provider_info = LLM_PROVIDERS.get(provider)
+        if provider_info is None:
             return False
-        
-        if model_key not in LLM_PROVIDERS[provider]["models"]:
+
+        model_info = provider_info["models"].get(model_key)
+        if model_info is None:
             return False
-        
-        model_info = LLM_PROVIDERS[provider]["models"][model_key]
-        
+
         self.current_provider = provider
         self.current_model_key = model_key
         self.current_model_id = model_info["id"]
@@ -558,11 +755,11 @@ class MacroMCPApp(App):
         
         # Update status bar
         try:
-            status_bar = self.query_one("#status-bar", StatusBar)
-            status_bar.current_model = f"{LLM_PROVIDERS[provider]['name']} - {model_info['name']}"
+            status_bar = self.status_bar
+            status_bar.current_model = f"{provider_info['name']} - {model_info['name']}"
         except:
             pass
-        
+
         return True
 
     def compose(self) -> ComposeResult:
@@ -602,11 +799,14 @@ class MacroMCPApp(App):
         # Focus en el input
         self.query_one("#chat-input", Input).focus()
 
-        # Set up periodic timestamp updates (every 30 seconds)
-        self.set_interval(30, self.update_timestamps)
+        # Set up periodic timestamp updates (every 30 seconds). Si más
+        # adelante se suman otras tareas periódicas (refresh de datasets,
+        # poll del backend GUI), conviene colgarlas de este mismo timer con
+        # cadencias múltiplos de 30s antes que apilar intervals separados.
+        self._timestamp_timer = self.set_interval(30, self.update_timestamps)
 
         # Mensaje de bienvenida
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
         chat_panel.add_message(
             "assistant",
             """# Welcome to Macro MCP! 🎉
@@ -646,14 +846,14 @@ Type your question or `/help` below to get started!
     def update_timestamps(self):
         """Periodic callback to update relative timestamps"""
         try:
-            chat_panel = self.query_one("#chat-panel", ChatPanel)
+            chat_panel = self.chat_panel
             chat_panel.update_relative_timestamps()
         except Exception:
             pass  # Ignore errors if panel not available
 
     async def connect_to_mcp(self) -> None:
         """Conectar al servidor MCP"""
-        status_bar = self.query_one("#status-bar", StatusBar)
+        status_bar = self.status_bar
         status_bar.connection_status = "🟡 Connecting..."
 
         try:
@@ -681,12 +881,13 @@ Type your question or `/help` below to get started!
             # Inicializar sesión
             await self.session.initialize()
 
-            # Obtener herramientas
-            response = await self.session.list_tools()
+            # Obtener herramientas y recursos en paralelo: son RPCs
+            # independientes, no hace falta pagar dos roundtrips seriales
+            response, resources_response = await asyncio.gather(
+                self.session.list_tools(),
+                self.session.list_resources(),
+            )
             self.tools_available = response.tools
-
-            # Obtener recursos
-            resources_response = await self.session.list_resources()
             self.resources_available = resources_response.resources
 
             # Actualizar status
@@ -708,16 +909,19 @@ Type your question or `/help` below to get started!
             if not self.session:
                 return
 
-            # Leer recurso fred://datasets/recent
-            resources_response = await self.session.list_resources()
+            # Leer recurso fred://datasets/recent. La lista de recursos ya se
+            # obtuvo al conectar; solo se re-consulta si todavía no está.
+            if not self.resources_available:
+                resources_response = await self.session.list_resources()
+                self.resources_available = resources_response.resources
 
-            for resource in resources_response.resources:
+            for resource in self.resources_available:
                 if str(resource.uri) == "fred://datasets/recent":
                     result = await self.session.read_resource(resource.uri)
                     datasets_text = result.contents[0].text if result.contents else "No datasets found"
 
                     # Actualizar panel de datasets
-                    dataset_panel = self.query_one("#dataset-panel", DatasetPanel)
+                    dataset_panel = self.dataset_panel
                     await dataset_panel.update_datasets(datasets_text)
                     break
         except Exception as e:
@@ -741,7 +945,7 @@ Type your question or `/help` below to get started!
             return
 
         # Agregar mensaje del usuario al chat
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
         chat_panel.add_message("user", query)
 
         # Mostrar indicador de "pensando"
@@ -760,7 +964,7 @@ Type your question or `/help` below to get started!
             chat_panel.add_message("assistant", response)
 
             # Actualizar contador de mensajes
-            status_bar = self.query_one("#status-bar", StatusBar)
+            status_bar = self.status_bar
             status_bar.message_count = len(self.conversation_history)
 
         except Exception as e:
@@ -770,7 +974,7 @@ Type your question or `/help` below to get started!
 
     async def handle_slash_command(self, command_text: str) -> None:
         """Manejar comandos slash"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         # Parsear comando y argumentos
         parts = command_text[1:].split(maxsplit=1)
@@ -822,7 +1026,7 @@ Type your question or `/help` below to get started!
 
     async def cmd_model(self, args: str) -> None:
         """Cambiar modelo de LLM"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         if not args.strip():
             # Show current model and available options
@@ -849,7 +1053,7 @@ Type your question or `/help` below to get started!
                 available_text += "\n"
             
             # Gemini models
-            if GEMINI_AVAILABLE and os.getenv("GEMINI_API_KEY"):
+            if GEMINI_AVAILABLE and self._gemini_key_available:
                 available_text += "**Gemini (Google):** ❌ No MCP tool support\n"
                 for key, model_info in LLM_PROVIDERS["gemini"]["models"].items():
                     marker = "✅" if self.current_provider == "gemini" and self.current_model_key == key else "  "
@@ -871,8 +1075,9 @@ Type your question or `/help` below to get started!
         provider = provider.lower()
         model_key = model_key.lower()
         
-        # Validate provider
-        if provider not in LLM_PROVIDERS:
+        # Validate provider (chequeo de existencia y acceso en un solo lookup)
+        provider_info = LLM_PROVIDERS.get(provider)
+        if provider_info is None:
             chat_panel.add_message("assistant", f"❌ Unknown provider: `{provider}`\n\nAvailable: `claude`, `gemini`")
             return
         
@@ -885,27 +1090,27 @@ Type your question or `/help` below to get started!
             chat_panel.add_message("assistant", "❌ OpenAI not available. Install openai package and check OPENAI_API_KEY in .env")
             return
         
-        if provider == "gemini" and (not GEMINI_AVAILABLE or not os.getenv("GEMINI_API_KEY")):
+        if provider == "gemini" and (not GEMINI_AVAILABLE or not self._gemini_key_available):
             chat_panel.add_message("assistant", "❌ Gemini not available. Install google-generativeai and check GEMINI_API_KEY in .env")
             return
         
         # Validate model key
-        if model_key not in LLM_PROVIDERS[provider]["models"]:
-            available_keys = ", ".join(LLM_PROVIDERS[provider]["models"].keys())
+        model_info = provider_info["models"].get(model_key)
+        if model_info is None:
+            available_keys = ", ".join(provider_info["models"].keys())
             chat_panel.add_message("assistant", f"❌ Unknown model: `{model_key}`\n\n**Available for {provider}:** {available_keys}")
             return
-        
+
         # Set model
         success = self._set_model(provider, model_key)
-        
+
         if success:
-            model_info = LLM_PROVIDERS[provider]["models"][model_key]
-            chat_panel.add_message("assistant", f"✅ Switched to: **{LLM_PROVIDERS[provider]['name']} - {model_info['name']}**\n\nModel ID: `{model_info['id']}`")
+            model_label = f"{provider_info['name']} - {model_info['name']}"
+            chat_panel.add_message("assistant", f"✅ Switched to: **{model_label}**\n\nModel ID: `{model_info['id']}`")
             self.notify(f"Model: {provider}:{model_key}", severity="information")
-            
+
             # Update status bar
-            status_bar = self.query_one("#status-bar", StatusBar)
-            status_bar.current_model = f"{LLM_PROVIDERS[provider]['name']} - {model_info['name']}"
+            self.status_bar.current_model = model_label
         else:
             chat_panel.add_message("assistant", f"❌ Failed to switch model. Please try again.")
 
@@ -942,10 +1147,10 @@ Type your question or `/help` below to get started!
     async def _process_with_claude(self, available_tools: List[Dict]) -> str:
         """Process query with Claude"""
         # Llamar a Claude
-        claude_response = self.anthropic_client.messages.create(
+        claude_response = await self._anthropic_create(
             model=self.current_model_id,
             max_tokens=4096,
-            messages=self.conversation_history.copy(),
+            messages=self.conversation_history,
             tools=available_tools,
         )
 
@@ -975,27 +1180,21 @@ Type your question or `/help` below to get started!
 
                 try:
                     # Mostrar que se está ejecutando la tool
-                    chat_panel = self.query_one("#chat-panel", ChatPanel)
-                    args_preview = ", ".join([f"{k}={str(v)[:20]}" for k, v in list(tool_args.items())[:2]])
+                    chat_panel = self.chat_panel
+                    args_preview = ", ".join(f"{k}={_short_arg(v)}" for k, v in islice(tool_args.items(), 2))
                     chat_panel.add_message("assistant", f"🔧 **Ejecutando:** `{tool_name}({args_preview}...)`")
 
                     # ==================== SUPPRESS LOGGING DURING TOOL CALL ====================
-                    # Temporarily suppress all logging to prevent terminal corruption
-                    old_level = logging.root.level
-                    logging.root.setLevel(logging.CRITICAL + 1)  # Disable all logs
-                    
-                    try:
+                    # Suppress logging output to prevent terminal corruption
+                    with _SilenceLogs():
                         # Call tool (now silent)
                         tool_result = await self.session.call_tool(tool_name, tool_args)
-                        
+
                         result_text = (
                             tool_result.content[0].text
                             if tool_result.content and hasattr(tool_result.content[0], "text")
                             else str(tool_result.content)
                         )
-                    finally:
-                        # Restore logging level
-                        logging.root.setLevel(old_level)
                     # ==================== END SUPPRESSION ====================
 
                     # Formatear resultado (NOW plot_path should exist)
@@ -1027,7 +1226,7 @@ Type your question or `/help` below to get started!
 
         # Mostrar resultados formateados de tools
         if formatted_tool_outputs:
-            chat_panel = self.query_one("#chat-panel", ChatPanel)
+            chat_panel = self.chat_panel
             for formatted_output in formatted_tool_outputs:
                 chat_panel.add_message("assistant", formatted_output)
 
@@ -1038,7 +1237,7 @@ Type your question or `/help` below to get started!
                 "content": tool_results
             })
 
-            followup = self.anthropic_client.messages.create(
+            followup = await self._anthropic_create(
                 model=self.current_model_id,
                 max_tokens=4096,
                 messages=self.conversation_history,
@@ -1056,7 +1255,13 @@ Type your question or `/help` below to get started!
             })
 
         # Guardar en history manager
-        final_response = "\n".join(final_output) if final_output else "No response generated."
+        # Fast path: la gran mayoria de respuestas tiene un solo bloque de texto
+        if not final_output:
+            final_response = "No response generated."
+        elif len(final_output) == 1:
+            final_response = final_output[0]
+        else:
+            final_response = "\n".join(final_output)
         self.history_manager.add(
             query=self.conversation_history[-2]["content"] if len(self.conversation_history) >= 2 else "",
             response=final_response,
@@ -1064,7 +1269,7 @@ Type your question or `/help` below to get started!
         )
 
         # Actualizar panel de historial
-        history_panel = self.query_one("#history-panel", HistoryPanel)
+        history_panel = self.history_panel
         history_panel.update_history(list(self.history_manager.history))
 
         return final_response
@@ -1102,7 +1307,7 @@ Type your question or `/help` below to get started!
                         })
             
             # Call OpenAI
-            response = self.openai_client.chat.completions.create(
+            response = await self._openai_create(
                 model=self.current_model_id,
                 messages=openai_messages,
                 tools=openai_tools if openai_tools else None,
@@ -1124,13 +1329,13 @@ Type your question or `/help` below to get started!
             if message.tool_calls:
                 for tool_call in message.tool_calls:
                     tool_name = tool_call.function.name
-                    tool_args = json.loads(tool_call.function.arguments)
+                    tool_args = _loads(tool_call.function.arguments)
                     tools_used.append(tool_name)
                     
                     try:
                         # Show execution
-                        chat_panel = self.query_one("#chat-panel", ChatPanel)
-                        args_preview = ", ".join([f"{k}={str(v)[:20]}" for k, v in list(tool_args.items())[:2]])
+                        chat_panel = self.chat_panel
+                        args_preview = ", ".join(f"{k}={_short_arg(v)}" for k, v in islice(tool_args.items(), 2))
                         chat_panel.add_message("assistant", f"🔧 **Ejecutando:** `{tool_name}({args_preview}...)`")
                         
                         # Execute MCP tool
@@ -1171,7 +1376,7 @@ Type your question or `/help` below to get started!
                 
                 # Get follow-up response with tool results
                 if openai_messages[-1]["role"] == "tool":
-                    followup = self.openai_client.chat.completions.create(
+                    followup = await self._openai_create(
                         model=self.current_model_id,
                         messages=openai_messages,
                         max_tokens=4096,
@@ -1181,8 +1386,14 @@ Type your question or `/help` below to get started!
                         final_output.append(followup.choices[0].message.content)
             
             # Save to history
-            final_response = "\n".join(final_output) if final_output else "No response generated."
-            
+            # Fast path: la gran mayoria de respuestas tiene un solo bloque de texto
+            if not final_output:
+                final_response = "No response generated."
+            elif len(final_output) == 1:
+                final_response = final_output[0]
+            else:
+                final_response = "\n".join(final_output)
+
             self.conversation_history.append({
                 "role": "assistant",
                 "content": final_response
@@ -1195,7 +1406,7 @@ Type your question or `/help` below to get started!
             )
             
             # Update history panel
-            history_panel = self.query_one("#history-panel", HistoryPanel)
+            history_panel = self.history_panel
             history_panel.update_history(list(self.history_manager.history))
             
             return final_response
@@ -1205,23 +1416,31 @@ Type your question or `/help` below to get started!
 
     def _convert_tools_to_openai_format(self, mcp_tools: List[Dict]) -> List[Dict]:
         """Convert MCP tools to OpenAI function calling format"""
-        openai_tools = []
-        for tool in mcp_tools:
-            openai_tools.append({
+        # La lista de tools es estable entre queries (viene cacheada): si es
+        # el mismo objeto, reusar la conversión anterior en vez de reconstruir
+        # los dicts en cada mensaje
+        if self._openai_tools_cache and self._openai_tools_cache[0] is mcp_tools:
+            return self._openai_tools_cache[1]
+
+        openai_tools = [
+            {
                 "type": "function",
                 "function": {
                     "name": tool["name"],
                     "description": tool["description"],
                     "parameters": tool["input_schema"]
                 }
-            })
+            }
+            for tool in mcp_tools
+        ]
+        self._openai_tools_cache = (mcp_tools, openai_tools)
         return openai_tools
 
     # ==================== SLASH COMMAND HANDLERS ====================
 
     async def cmd_help(self, args: str) -> None:
         """Mostrar ayuda de comandos"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         help_text = """# 📚 Available Commands
 
@@ -1265,7 +1484,7 @@ Type your question or `/help` below to get started!
 
     async def cmd_tools(self, args: str) -> None:
         """Listar herramientas o mostrar detalles"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         if not self.session:
             chat_panel.add_message("assistant", "❌ Not connected to MCP server")
@@ -1282,14 +1501,15 @@ Type your question or `/help` below to get started!
             if args.strip():
                 # Mostrar detalles de herramienta específica
                 tool_name = args.strip()
-                tool = next((t for t in tools if t.name == tool_name), None)
+                tools_by_name = {t.name: t for t in tools}
+                tool = tools_by_name.get(tool_name)
 
                 if not tool:
                     chat_panel.add_message("assistant", f"❌ Tool not found: `{tool_name}`\n\nUse `/tools` to see all available tools.")
                     return
 
                 # Formatear detalles de la tool
-                schema = json.dumps(tool.inputSchema, indent=2) if hasattr(tool, 'inputSchema') else "N/A"
+                schema = _dump_schema(tool.inputSchema) if hasattr(tool, 'inputSchema') else "N/A"
 
                 details = f"""### 🔧 {tool.name}
 
@@ -1303,13 +1523,14 @@ Type your question or `/help` below to get started!
 """
                 chat_panel.add_message("assistant", details)
             else:
-                # Listar todas las herramientas
-                tools_list = f"### 🔧 Available Tools ({len(tools)})\n\n"
+                # Listar todas las herramientas (piezas + join, no += en loop)
+                parts = [f"### 🔧 Available Tools ({len(tools)})\n\n"]
                 for i, tool in enumerate(tools, 1):
                     desc = tool.description[:80] + "..." if len(tool.description) > 80 else tool.description
-                    tools_list += f"{i}. **{tool.name}**\n   {desc}\n\n"
+                    parts.append(f"{i}. **{tool.name}**\n   {desc}\n\n")
 
-                tools_list += "\n💡 Use `/tools <name>` to see details of a specific tool."
+                parts.append("\n💡 Use `/tools <name>` to see details of a specific tool.")
+                tools_list = "".join(parts)
                 chat_panel.add_message("assistant", tools_list)
 
         except Exception as e:
@@ -1317,7 +1538,7 @@ Type your question or `/help` below to get started!
 
     async def cmd_resources(self, args: str) -> None:
         """Listar recursos o leer uno específico"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         if not self.session:
             chat_panel.add_message("assistant", "❌ Not connected to MCP server")
@@ -1334,7 +1555,8 @@ Type your question or `/help` below to get started!
             if args.strip():
                 # Leer recurso específico
                 resource_uri = args.strip()
-                resource = next((r for r in resources if str(r.uri) == resource_uri), None)
+                resources_by_uri = {str(r.uri): r for r in resources}
+                resource = resources_by_uri.get(resource_uri)
 
                 if not resource:
                     chat_panel.add_message("assistant", f"❌ Resource not found: `{resource_uri}`\n\nUse `/resources` to see all available resources.")
@@ -1352,18 +1574,19 @@ Type your question or `/help` below to get started!
                 else:
                     chat_panel.add_message("assistant", f"⚠️ Resource `{resource_uri}` is empty")
             else:
-                # Listar todos los recursos
-                resources_list = f"### 📦 Available Resources ({len(resources)})\n\n"
+                # Listar todos los recursos (piezas + join, no += en loop)
+                parts = [f"### 📦 Available Resources ({len(resources)})\n\n"]
                 for i, resource in enumerate(resources, 1):
                     uri = str(resource.uri)
                     name = resource.name if hasattr(resource, 'name') else uri
                     desc = resource.description[:80] + "..." if hasattr(resource, 'description') and len(resource.description) > 80 else ""
-                    resources_list += f"{i}. **{name}**\n   URI: `{uri}`\n"
+                    parts.append(f"{i}. **{name}**\n   URI: `{uri}`\n")
                     if desc:
-                        resources_list += f"   {desc}\n"
-                    resources_list += "\n"
+                        parts.append(f"   {desc}\n")
+                    parts.append("\n")
 
-                resources_list += "\n💡 Use `/resources <uri>` to read a specific resource."
+                parts.append("\n💡 Use `/resources <uri>` to read a specific resource.")
+                resources_list = "".join(parts)
                 chat_panel.add_message("assistant", resources_list)
 
         except Exception as e:
@@ -1371,37 +1594,34 @@ Type your question or `/help` below to get started!
 
     async def cmd_clear(self, args: str) -> None:
         """Limpiar el panel de chat"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
         chat_panel.clear_messages()
         chat_panel.add_message("assistant", "✅ Chat cleared!")
         self.notify("Chat cleared", severity="information")
 
     async def cmd_history(self, args: str) -> None:
         """Mostrar historial de conversación"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         if len(self.history_manager) == 0:
             chat_panel.add_message("assistant", "ℹ️ History is empty")
             return
 
-        history_text = f"### 📚 Conversation History ({len(self.history_manager)} items)\n\n"
+        parts = [f"### 📚 Conversation History ({len(self.history_manager)} items)\n\n"]
 
         for i, item in enumerate(list(self.history_manager.history)[-10:], 1):
             timestamp = item.get('timestamp', 'Unknown')
             query = item.get('query', '')[:60] + "..." if len(item.get('query', '')) > 60 else item.get('query', '')
-            response = item.get('response', '')[:100] + "..." if len(item.get('response', '')) > 100 else item.get('response', '')
             tools = ", ".join(item.get('tools_used', [])) or "None"
 
-            history_text += f"**{i}. {timestamp}**\n"
-            history_text += f"   *Query:* {query}\n"
-            history_text += f"   *Tools:* {tools}\n\n"
+            parts.append(f"**{i}. {timestamp}**\n   *Query:* {query}\n   *Tools:* {tools}\n\n")
 
-        history_text += "\n*Showing last 10 items*"
-        chat_panel.add_message("assistant", history_text)
+        parts.append("\n*Showing last 10 items*")
+        chat_panel.add_message("assistant", "".join(parts))
 
     async def cmd_status(self, args: str) -> None:
         """Mostrar estado del cliente"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         try:
             tools_count = len(self.tools_available) if self.tools_available else 0
@@ -1431,7 +1651,7 @@ Type your question or `/help` below to get started!
 
     async def cmd_load(self, args: str) -> None:
         """Cargar conversación guardada"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         if not args.strip():
             chat_panel.add_message("assistant", "❌ Please specify a filename\n\n**Usage:** `/load <filename>`")
@@ -1444,11 +1664,11 @@ Type your question or `/help` below to get started!
         filepath = os.path.join("conversations", filename)
 
         try:
-            count = self.history_manager.load_json(filepath)
+            count = await asyncio.to_thread(self.history_manager.load_json, filepath)
             chat_panel.add_message("assistant", f"✅ Loaded conversation: **{count}** items\n\nFile: `{filepath}`")
 
             # Actualizar panel de historial
-            history_panel = self.query_one("#history-panel", HistoryPanel)
+            history_panel = self.history_panel
             history_panel.update_history(list(self.history_manager.history))
 
             self.notify(f"Loaded {count} items", severity="information")
@@ -1459,7 +1679,7 @@ Type your question or `/help` below to get started!
 
     async def cmd_export(self, args: str) -> None:
         """Exportar conversación"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         if len(self.history_manager) == 0:
             chat_panel.add_message("assistant", "⚠️ No conversations to export")
@@ -1475,10 +1695,11 @@ Type your question or `/help` below to get started!
             return
 
         try:
+            # Escritura bloqueante fuera del event loop para no congelar la TUI
             if formato in ["md", "markdown"]:
-                filepath = self.history_manager.export_markdown(filename)
+                filepath = await asyncio.to_thread(self.history_manager.export_markdown, filename)
             else:
-                filepath = self.history_manager.export_json(filename)
+                filepath = await asyncio.to_thread(self.history_manager.export_json, filename)
 
             chat_panel.add_message("assistant", f"✅ Conversation exported in **{formato.upper()}** format\n\nFile: `{filepath}`")
             self.notify(f"Exported to {filepath}", severity="information")
@@ -1487,7 +1708,7 @@ Type your question or `/help` below to get started!
 
     async def cmd_search(self, args: str) -> None:
         """Buscar en historial"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         if not args.strip():
             chat_panel.add_message("assistant", "❌ Please specify a keyword\n\n**Usage:** `/search <keyword>`")
@@ -1502,29 +1723,27 @@ Type your question or `/help` below to get started!
                 chat_panel.add_message("assistant", f"ℹ️ No results found for: **'{keyword}'**")
                 return
 
-            # Formatear resultados
-            search_text = f"### 🔍 Search Results for: '{keyword}'\n\n**Found:** {len(results)} items\n\n"
+            # Formatear resultados (piezas + join, no += en loop)
+            parts = [f"### 🔍 Search Results for: '{keyword}'\n\n**Found:** {len(results)} items\n\n"]
 
             for i, item in enumerate(results[:10], 1):
                 timestamp = item.get('timestamp', 'Unknown')
                 query = item.get('query', '')[:80] + "..." if len(item.get('query', '')) > 80 else item.get('query', '')
                 response = item.get('response', '')[:100] + "..." if len(item.get('response', '')) > 100 else item.get('response', '')
 
-                search_text += f"**{i}. {timestamp}**\n"
-                search_text += f"   *Query:* {query}\n"
-                search_text += f"   *Response:* {response}\n\n"
+                parts.append(f"**{i}. {timestamp}**\n   *Query:* {query}\n   *Response:* {response}\n\n")
 
             if len(results) > 10:
-                search_text += f"\n*Showing first 10 of {len(results)} results*"
+                parts.append(f"\n*Showing first 10 of {len(results)} results*")
 
-            chat_panel.add_message("assistant", search_text)
+            chat_panel.add_message("assistant", "".join(parts))
 
         except Exception as e:
             chat_panel.add_message("assistant", f"❌ Error searching: {str(e)}")
 
     async def cmd_stats(self, args: str) -> None:
         """Mostrar estadísticas"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         try:
             stats = self.history_manager.get_stats()
@@ -1552,7 +1771,7 @@ Type your question or `/help` below to get started!
 
     async def cmd_examples(self, args: str) -> None:
         """Mostrar ejemplos de consultas"""
-        chat_panel = self.query_one("#chat-panel", ChatPanel)
+        chat_panel = self.chat_panel
 
         examples_text = """### 💡 Example Queries
 
@@ -1594,17 +1813,15 @@ Type your question or `/help` below to get started!
 
     def _format_tool_result(self, tool_name: str, result_text: str) -> str:
         """Formatear resultado de herramienta para mejor visualización."""
-        import json
-
         try:
-            result_json = json.loads(result_text)
+            result_json = _loads(result_text)
             
             # ==================== FIX: NESTED JSON ====================
             # Check if result is nested (has "message" field with JSON string)
             if isinstance(result_json, dict) and "message" in result_json:
                 try:
                     # Parse nested JSON from "message" field
-                    nested_json = json.loads(result_json["message"])
+                    nested_json = _loads(result_json["message"])
                     result_json = nested_json
                 except (json.JSONDecodeError, TypeError):
                     pass
@@ -1624,18 +1841,13 @@ Type your question or `/help` below to get started!
                     if GUI_AUTO_OPEN and self.gui_backend and self.gui_backend.can_display_gui():
                         try:
                             # ==================== SUPPRESS LOGGING DURING GUI LAUNCH ====================
-                            old_level = logging.root.level
-                            logging.root.setLevel(logging.CRITICAL + 1)
-                            
-                            try:
+                            with _SilenceLogs():
                                 series_id = result_json.get("series_id", "Plot")
-                                
+
                                 success = self.gui_backend.open_image(
                                     plot_path,
                                     title=f"FRED Plot - {series_id}"
                                 )
-                            finally:
-                                logging.root.setLevel(old_level)
                             # ==================== END SUPPRESSION ====================
                             
                             if success:
@@ -1681,31 +1893,31 @@ Type your question or `/help` below to get started!
                 series_id = result_json.get("series_id", "N/A")
                 total = metadata.get("total_count", len(data))
 
-                formatted = f"""### 📈 Observaciones: {series_id}
+                parts = [f"""### 📈 Observaciones: {series_id}
 **Total de observaciones:** {total}
 
 **Primeras 5 observaciones:**
 | Fecha | Valor |
 |-------|-------|
-"""
+"""]
                 for obs in data[:5]:
                     date = str(obs.get('date', 'N/A')).split('T')[0]
                     value = obs.get('value', 'N/A')
-                    formatted += f"| {date} | {value} |\n"
+                    parts.append(f"| {date} | {value} |\n")
 
                 if len(data) > 5:
-                    formatted += f"\n**Últimas 5 observaciones:**\n| Fecha | Valor |\n|-------|-------|\n"
+                    parts.append("\n**Últimas 5 observaciones:**\n| Fecha | Valor |\n|-------|-------|\n")
                     for obs in data[-5:]:
                         date = str(obs.get('date', 'N/A')).split('T')[0]
                         value = obs.get('value', 'N/A')
-                        formatted += f"| {date} | {value} |\n"
+                        parts.append(f"| {date} | {value} |\n")
 
                 # Estadísticas
                 values = [float(obs['value']) for obs in data if obs.get('value') not in ['N/A', None, 'nan']]
                 if values:
-                    formatted += f"\n**Estadísticas:**\n- Mínimo: {min(values):.2f}\n- Máximo: {max(values):.2f}\n- Promedio: {sum(values)/len(values):.2f}\n"
+                    parts.append(f"\n**Estadísticas:**\n- Mínimo: {min(values):.2f}\n- Máximo: {max(values):.2f}\n- Promedio: {sum(values)/len(values):.2f}\n")
 
-                return formatted
+                return "".join(parts)
 
             elif tool_name == "search_fred_series_tool" and "data" in result_json:
                 data = result_json["data"]
@@ -1713,23 +1925,23 @@ Type your question or `/help` below to get started!
                 search_text = result_json.get("search_text", "N/A")
                 total = metadata.get("total_count", len(data))
 
-                formatted = f"""### 🔍 Búsqueda: "{search_text}"
+                parts = [f"""### 🔍 Búsqueda: "{search_text}"
 **Resultados:** {total}
 
 | ID | Título | Popularidad | Frecuencia |
 |----|--------|-------------|-----------|
-"""
+"""]
                 for result in data[:10]:
                     series_id = result.get('id', 'N/A')
                     title = result.get('title', 'N/A')[:50]
                     pop = result.get('popularity', 'N/A')
                     freq = result.get('frequency_short', 'N/A')
-                    formatted += f"| {series_id} | {title}... | {pop} | {freq} |\n"
+                    parts.append(f"| {series_id} | {title}... | {pop} | {freq} |\n")
 
                 if total > 10:
-                    formatted += f"\n*Mostrando primeros 10 de {total} resultados*\n"
+                    parts.append(f"\n*Mostrando primeros 10 de {total} resultados*\n")
 
-                return formatted
+                return "".join(parts)
 
             # Para otros tools, intentar formatear JSON de manera legible
             if isinstance(result_json, dict) and "data" in result_json:
@@ -1800,7 +2012,7 @@ Type your question or `/help` below to get started!
 
         elif event.button.id == "build-dataset":
             # Mostrar mensaje en el chat sugiriendo cómo construir dataset
-            chat_panel = self.query_one("#chat-panel", ChatPanel)
+            chat_panel = self.chat_panel
             chat_panel.add_message(
                 "assistant",
                 """To build a new dataset, tell me:
@@ -1815,7 +2027,7 @@ Type your question or `/help` below to get started!
 
         elif event.button.id == "clear-history":
             self.history_manager.clear()
-            history_panel = self.query_one("#history-panel", HistoryPanel)
+            history_panel = self.history_panel
             history_panel.update_history([])
             self.notify("History cleared", severity="information")
 
@@ -1835,7 +2047,7 @@ Type your question or `/help` below to get started!
         """Iniciar nueva conversación"""
         # Limpiar historial de conversación
         self.conversation_history.clear()
-        status_bar = self.query_one("#status-bar", StatusBar)
+        status_bar = self.status_bar
         status_bar.message_count = 0
 
         self.notify("New conversation started", severity="information")
@@ -1862,7 +2074,7 @@ Type your question or `/help` below to get started!
         if self.session:
             resources_response = await self.session.list_resources()
             self.resources_available = resources_response.resources
-            status_bar = self.query_one("#status-bar", StatusBar)
+            status_bar = self.status_bar
             status_bar.resources_count = len(self.resources_available)
         
         self.notify("Resources refreshed", severity="information")
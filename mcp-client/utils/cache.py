@@ -10,6 +10,8 @@ from typing import Any, Optional, Dict, Tuple
 class ResourceCache:
     """Simple TTL-based cache for MCP resources and tools."""
 
+    __slots__ = ('cache', 'ttl')
+
     def __init__(self, ttl: int = 300):
         """
         Initialize resource cache.
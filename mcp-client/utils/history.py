@@ -3,15 +3,44 @@ Conversation History Management
 Handles storing, searching, and exporting conversation history.
 """
 
-from typing import List, Dict, Optional
+from typing import FrozenSet, List, Dict, Optional
 from datetime import datetime
+from itertools import islice
 import json
+import mmap
 import os
+import re
+import sys
+
+# orjson serializa/parsea en C varias veces mas rapido que json; si no
+# esta instalado se usa la stdlib sin cambio de comportamiento
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Tokenizer y stop-words para el indice de terminos exactos
+_TERM_RE = re.compile(r"[a-z0-9_]+")
+_STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'that', 'the', 'to', 'with',
+    'de', 'del', 'el', 'en', 'es', 'la', 'las', 'los', 'para', 'por',
+    'que', 'un', 'una', 'y',
+})
+
+
+def _extract_terms(text: str) -> FrozenSet[str]:
+    """Extract unique lowercase terms from text, excluding stop words."""
+    return frozenset(_TERM_RE.findall(text.lower())) - _STOP_WORDS
 
 
 class ConversationHistory:
     """Manages conversation history with search and export capabilities."""
 
+    __slots__ = ('history', 'max_items', '_search_blobs', '_term_sets',
+                 '_tools_usage')
+
     def __init__(self, max_items: int = 100):
         """
         Initialize conversation history.
@@ -21,6 +50,15 @@ class ConversationHistory:
         """
         self.history: List[Dict] = []
         self.max_items = max_items
+        # Parallel list of precomputed lowercase "query\nresponse" blobs so
+        # search() does not re-lower both fields of every item on each call
+        self._search_blobs: List[str] = []
+        # Per-item term sets: fast path for single-word searches (set
+        # membership instead of a substring scan over the whole blob)
+        self._term_sets: List[FrozenSet[str]] = []
+        # Contadores incrementales de uso de tools: get_stats los lee tal
+        # cual en vez de reagregar todo el historial en cada llamada
+        self._tools_usage: Dict[str, int] = {}
 
     def add(self, query: str, response: str, tools_used: List[str] = None, timestamp: datetime = None):
         """
@@ -39,28 +77,113 @@ class ConversationHistory:
             'query': query,
             'response': response,
             'timestamp': timestamp.isoformat(),
-            'tools_used': tools_used or []
+            # sys.intern: los nombres de tools se repiten en casi todos los
+            # items, asi una sola copia del string vive en memoria
+            'tools_used': [sys.intern(t) for t in tools_used] if tools_used else []
         })
+        blob = f"{query}\n{response}".lower()
+        self._search_blobs.append(blob)
+        self._term_sets.append(_extract_terms(blob))
+        for tool in tools_used or []:
+            self._tools_usage[tool] = self._tools_usage.get(tool, 0) + 1
 
         # Remove oldest items if exceeding max
         if len(self.history) > self.max_items:
-            self.history.pop(0)
+            evicted = self.history.pop(0)
+            self._search_blobs.pop(0)
+            self._term_sets.pop(0)
+            self._discount_tools(evicted)
+
+    def add_batch(self, items: List[Dict]) -> int:
+        """
+        Add multiple conversation items in one pass.
+
+        Cheaper than calling add() per item: one extend of the backing
+        lists and a single trim at the end instead of a pop per overflow.
+
+        Args:
+            items: List of dicts with 'query', 'response' and optionally
+                   'tools_used' and 'timestamp' (datetime)
+
+        Returns:
+            Number of items added
+        """
+        if not items:
+            return 0
+
+        now_iso = datetime.now().isoformat()
+        new_rows = []
+        new_blobs = []
+        for item in items:
+            query = item.get('query', '')
+            response = item.get('response', '')
+            timestamp = item.get('timestamp')
+            tools_used = item.get('tools_used')
+            new_rows.append({
+                'query': query,
+                'response': response,
+                'timestamp': timestamp.isoformat() if timestamp else now_iso,
+                'tools_used': [sys.intern(t) for t in tools_used] if tools_used else []
+            })
+            new_blobs.append(f"{query}\n{response}".lower())
+
+        self.history.extend(new_rows)
+        self._search_blobs.extend(new_blobs)
+        self._term_sets.extend(_extract_terms(blob) for blob in new_blobs)
+        for row in new_rows:
+            for tool in row['tools_used']:
+                self._tools_usage[tool] = self._tools_usage.get(tool, 0) + 1
+
+        # Single trim instead of one pop per excess item
+        if len(self.history) > self.max_items:
+            for evicted in self.history[:-self.max_items]:
+                self._discount_tools(evicted)
+            self.history = self.history[-self.max_items:]
+            self._search_blobs = self._search_blobs[-self.max_items:]
+            self._term_sets = self._term_sets[-self.max_items:]
 
-    def search(self, keyword: str) -> List[Dict]:
+        return len(new_rows)
+
+    def _discount_tools(self, item: Dict):
+        """Restar del contador los tools de un item desalojado del historial."""
+        for tool in item.get('tools_used', []):
+            count = self._tools_usage.get(tool, 0) - 1
+            if count > 0:
+                self._tools_usage[tool] = count
+            else:
+                self._tools_usage.pop(tool, None)
+
+    def search(self, keyword: str, limit: int = None) -> List[Dict]:
         """
         Search conversation history by keyword.
 
         Args:
             keyword: Keyword to search for (case-insensitive)
+            limit: Maximum number of matches to return; the scan stops
+                   early once this many items have matched
 
         Returns:
             List of matching conversation items
         """
         keyword_lower = keyword.lower()
-        return [
-            item for item in self.history
-            if keyword_lower in item['query'].lower() or keyword_lower in item['response'].lower()
-        ]
+
+        # Fast path: un solo termino exacto se resuelve por membership en el
+        # set de terminos de cada item en vez de escanear el blob completo
+        if _TERM_RE.fullmatch(keyword_lower) and keyword_lower not in _STOP_WORDS:
+            matches = (
+                item for item, terms in zip(self.history, self._term_sets)
+                if keyword_lower in terms
+            )
+        else:
+            matches = (
+                item for item, blob in zip(self.history, self._search_blobs)
+                if keyword_lower in blob
+            )
+
+        if limit is None:
+            return list(matches)
+        # Top-K: islice corta el escaneo en cuanto hay `limit` matches
+        return list(islice(matches, limit))
 
     def get_last_n(self, n: int) -> List[Dict]:
         """
@@ -72,11 +195,47 @@ class ConversationHistory:
         Returns:
             List of last N conversation items
         """
-        return self.history[-n:] if n < len(self.history) else self.history
+        # Slicing is O(n) on the returned window only, and always returning a
+        # fresh slice avoids handing callers a reference to the internal list
+        return self.history[-n:]
 
-    def clear(self):
-        """Clear all conversation history."""
-        self.history.clear()
+    def clear(self, before_date: str = None) -> int:
+        """
+        Clear conversation history, optionally only items before a date.
+
+        Args:
+            before_date: ISO date/datetime string; if given, only items
+                         with an older timestamp are removed
+
+        Returns:
+            Number of items removed
+        """
+        if before_date is None:
+            removed = len(self.history)
+            self.history.clear()
+            self._search_blobs.clear()
+            self._term_sets.clear()
+            self._tools_usage.clear()
+            return removed
+
+        # Los timestamps ISO comparan bien como strings; un solo pase
+        # particiona el historial en vez de borrar item por item
+        kept_history, kept_blobs, kept_terms = [], [], []
+        removed = 0
+        for item, blob, terms in zip(self.history, self._search_blobs,
+                                     self._term_sets):
+            if item.get('timestamp', '') < before_date:
+                self._discount_tools(item)
+                removed += 1
+            else:
+                kept_history.append(item)
+                kept_blobs.append(blob)
+                kept_terms.append(terms)
+        if removed:
+            self.history = kept_history
+            self._search_blobs = kept_blobs
+            self._term_sets = kept_terms
+        return removed
 
     def export_markdown(self, filename: str, directory: str = "conversations") -> str:
         """
@@ -98,12 +257,10 @@ class ConversationHistory:
 
         filepath = os.path.join(directory, filename)
 
-        # Generate markdown content
-        markdown_content = self._generate_markdown()
-
-        # Write to file
+        # Escribir las lineas a medida que se generan: nunca se materializa
+        # el markdown completo en memoria (lista de lineas + join)
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+            f.writelines(f"{line}\n" for line in self._iter_markdown_lines())
 
         return filepath
 
@@ -128,8 +285,12 @@ class ConversationHistory:
         filepath = os.path.join(directory, filename)
 
         # Write to file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.history, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(self.history, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(self.history, f, indent=2, ensure_ascii=False)
 
         return filepath
 
@@ -146,30 +307,63 @@ class ConversationHistory:
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"File not found: {filepath}")
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            loaded_history = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(filepath, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size > 64 * 1024:
+                    # Para archivos grandes, mmap deja que el parser lea
+                    # directo del page cache sin la copia kernel->usuario
+                    # de read(); por debajo de 64 KB no amortiza el setup
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    view = memoryview(mm)
+                    try:
+                        loaded_history = orjson.loads(view)
+                    finally:
+                        view.release()
+                        mm.close()
+                else:
+                    loaded_history = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                loaded_history = json.load(f)
 
         # Clear current history and load new one
         self.history.clear()
         self.history.extend(loaded_history)
 
+        # Internar los nombres de tools: tras un load desde JSON cada item
+        # trae su propia copia de los mismos pocos nombres
+        for item in self.history:
+            tools_used = item.get('tools_used')
+            if tools_used:
+                item['tools_used'] = [sys.intern(t) for t in tools_used]
+
         # Trim if exceeds max_items
         if len(self.history) > self.max_items:
             self.history = self.history[-self.max_items:]
 
+        # Rebuild search blobs and term sets for the loaded items
+        self._search_blobs = [
+            f"{item.get('query', '')}\n{item.get('response', '')}".lower()
+            for item in self.history
+        ]
+        self._term_sets = [_extract_terms(blob) for blob in self._search_blobs]
+        self._tools_usage = {}
+        for item in self.history:
+            for tool in item.get('tools_used', []):
+                self._tools_usage[tool] = self._tools_usage.get(tool, 0) + 1
+
         return len(self.history)
 
-    def _generate_markdown(self) -> str:
-        """Generate markdown content from history."""
-        lines = [
-            "# Conversation History",
-            "",
-            f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"**Total Conversations:** {len(self.history)}",
-            "",
-            "---",
-            ""
-        ]
+    def _iter_markdown_lines(self):
+        """Yield markdown lines from history one at a time."""
+        yield "# Conversation History"
+        yield ""
+        yield f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield f"**Total Conversations:** {len(self.history)}"
+        yield ""
+        yield "---"
+        yield ""
 
         for i, item in enumerate(self.history, 1):
             timestamp = item.get('timestamp', 'Unknown')
@@ -177,27 +371,29 @@ class ConversationHistory:
             response = item.get('response', '')
             tools_used = item.get('tools_used', [])
 
-            lines.append(f"## Conversation {i}")
-            lines.append("")
-            lines.append(f"**Date:** {timestamp}")
+            yield f"## Conversation {i}"
+            yield ""
+            yield f"**Date:** {timestamp}"
 
             if tools_used:
-                tools_str = ", ".join([f"`{tool}`" for tool in tools_used])
-                lines.append(f"**Tools Used:** {tools_str}")
-
-            lines.append("")
-            lines.append("### User Query")
-            lines.append("")
-            lines.append(query)
-            lines.append("")
-            lines.append("### Claude Response")
-            lines.append("")
-            lines.append(response)
-            lines.append("")
-            lines.append("---")
-            lines.append("")
-
-        return "\n".join(lines)
+                tools_str = ", ".join(f"`{tool}`" for tool in tools_used)
+                yield f"**Tools Used:** {tools_str}"
+
+            yield ""
+            yield "### User Query"
+            yield ""
+            yield query
+            yield ""
+            yield "### Claude Response"
+            yield ""
+            yield response
+            yield ""
+            yield "---"
+            yield ""
+
+    def _generate_markdown(self) -> str:
+        """Generate markdown content from history."""
+        return "\n".join(self._iter_markdown_lines()) + "\n"
 
     def get_stats(self) -> Dict:
         """
@@ -215,12 +411,6 @@ class ConversationHistory:
                 'date_range': None
             }
 
-        # Count tool usage
-        tools_usage = {}
-        for item in self.history:
-            for tool in item.get('tools_used', []):
-                tools_usage[tool] = tools_usage.get(tool, 0) + 1
-
         # Get date range
         timestamps = [item['timestamp'] for item in self.history]
         date_range = {
@@ -232,7 +422,7 @@ class ConversationHistory:
             'total_conversations': len(self.history),
             'total_queries': len(self.history),
             'total_responses': len(self.history),
-            'tools_usage': tools_usage,
+            'tools_usage': dict(self._tools_usage),
             'date_range': date_range
         }
 